@@ -38,6 +38,7 @@ from backend.routes.lists import lists_bp
 from backend.routes.groceryList import grocery_bp
 from backend.routes.meal_plan import meal_plan_bp
 from backend.routes.user_made_recipes import user_made_recipes_bp
+from backend.services import catalog
 # Initialize recipe routes with database
 
 
@@ -52,6 +53,11 @@ application.register_blueprint(user_made_recipes_bp, url_prefix='/api/user_recip
 
 application.config['SECRET_KEY'] = 'TEST SECRET KEY'
 
+# Build the in-memory catalog indexes before serving requests
+if application.config.get('WARM_INDEXES_ON_STARTUP'):
+    with application.app_context():
+        catalog.warm()
+
 
 UPLOAD_FOLDER = os.path.join(os.getcwd(), "uploaded_images")
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
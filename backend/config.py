@@ -12,6 +12,23 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # In-memory catalog indexes
+    WARM_INDEXES_ON_STARTUP = True
+    CATALOG_INDEX_TTL = 600  # seconds before a worker rebuilds its indexes
+    COUNT_CACHE_TTL = 300  # seconds a cached search/category total stays valid
+    SEARCH_BACKEND = 'auto'  # 'mysql' (FULLTEXT), 'memory' (in-process BM25) or 'auto'
+    PUBLIC_LISTS_TTL = 300  # seconds before a worker reloads the public list ranking
+    RATING_PRIOR_REVIEWS = 10  # imaginary mean-rated reviews in the sort=top weighted rating
+    
+    # Recipe detail cache ('memory' is per worker, 'filesystem' is shared by all workers)
+    RECIPE_CACHE_BACKEND = 'filesystem'
+    RECIPE_CACHE_DIR = './recipe_cache'
+    RECIPE_CACHE_TTL = 600
+    RECIPE_CACHE_MAX_ENTRIES = 5000
+    RECIPE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # memory backend only
+    LIST_MEMBERSHIP_TTL = 300  # seconds a user's list-membership map stays cached (same backend)
+    COOKABLE_CACHE_TTL = 300  # seconds a user's /cookable match list stays cached (memory, per worker)
+    
     # Flask settings
     DEBUG = True
     
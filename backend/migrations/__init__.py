@@ -0,0 +1,27 @@
+"""
+Schema migrations
+
+Every migration is idempotent (it checks the live schema before changing
+it), so the whole list can be re-run safely after each deploy:
+
+    python -m backend.migrations
+"""
+from backend.migrations import (
+    canonical_ingredients, category_index, duration_columns, fulltext_search, image_columns,
+    ingredient_vocabulary, list_discovery, list_items, nutrition_columns, rating_index, weighted_rating
+)
+
+# Applied in this order
+MIGRATIONS = [
+    fulltext_search,
+    image_columns,
+    category_index,
+    ingredient_vocabulary,
+    list_items,
+    list_discovery,
+    nutrition_columns,
+    duration_columns,
+    rating_index,
+    weighted_rating,
+    canonical_ingredients,
+]
@@ -0,0 +1,24 @@
+"""
+Run all schema migrations against the configured database
+"""
+from flask import Flask
+
+from backend.config import Config
+from backend.databse import db
+from backend.migrations import MIGRATIONS
+
+
+def main():
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+
+    with app.app_context():
+        for migration in MIGRATIONS:
+            print(f"Applying {migration.__name__}")
+            migration.upgrade()
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
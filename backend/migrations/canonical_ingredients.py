@@ -0,0 +1,20 @@
+"""
+Canonical ingredient names on `recipes`
+
+Adds CanonicalIngredients (JSON array, see backend/services/ingredient_canon.py)
+with the CanonicalVersion it was computed under, and backfills both from the
+`ingredients` column, so the ingredient matrix is built without re-parsing
+and canonicalizing every recipe. New writes fill them through
+ingredient_canon.canonical_columns (approve_recipe / admin_update_recipe).
+
+Rows written under an older CANON_VERSION are rewritten too, so a change to
+the canonicalization rules reaches every stored row on the next deploy.
+"""
+from backend.migrations.helpers import add_column
+from backend.services import ingredient_canon
+
+
+def upgrade():
+    add_column("recipes", "CanonicalIngredients", "JSON NULL")
+    add_column("recipes", "CanonicalVersion", "INT NULL")
+    ingredient_canon.backfill()
@@ -0,0 +1,11 @@
+"""
+Composite (RecipeCategory, RecipeId) index on `recipes`
+
+Covers the facet build in backend/services/category_index.py (an index-only
+scan instead of reading every row) and exact category lookups.
+"""
+from backend.migrations.helpers import add_index
+
+
+def upgrade():
+    add_index("recipes", "idx_recipes_category", "RecipeCategory, RecipeId")
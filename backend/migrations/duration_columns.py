@@ -0,0 +1,48 @@
+"""
+Integer-minute time columns on `recipes`
+
+Adds CookMinutes, PrepMinutes and TotalMinutes next to the ISO-8601
+CookTime/PrepTime/TotalTime strings ("PT1H30M"), a (TotalMinutes, RecipeId)
+index for the max_total_minutes filter and sort=time, and backfills them.
+New writes fill them through parsing.duration_columns (approve_recipe /
+admin_update_recipe).
+"""
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.migrations.helpers import add_column, add_index
+from backend.services.parsing import duration_columns
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    add_column("recipes", "CookMinutes", "INT NULL")
+    add_column("recipes", "PrepMinutes", "INT NULL")
+    add_column("recipes", "TotalMinutes", "INT NULL")
+    add_index("recipes", "idx_recipes_total_minutes", "TotalMinutes, RecipeId")
+
+    # Backfill in primary-key batches
+    last_id = 0
+    while True:
+        rows = db.session.execute(text("""
+            SELECT RecipeId, CookTime, PrepTime, TotalTime
+            FROM recipes
+            WHERE RecipeId > :last_id
+              AND CookMinutes IS NULL AND PrepMinutes IS NULL AND TotalMinutes IS NULL
+            ORDER BY RecipeId
+            LIMIT :limit
+        """), {"last_id": last_id, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        db.session.execute(
+            text("""
+                UPDATE recipes
+                SET CookMinutes = :CookMinutes, PrepMinutes = :PrepMinutes, TotalMinutes = :TotalMinutes
+                WHERE RecipeId = :rid
+            """),
+            [dict(duration_columns(row[1], row[2], row[3]), rid=row[0]) for row in rows]
+        )
+        db.session.commit()
+        last_id = rows[-1][0]
@@ -0,0 +1,19 @@
+"""
+FULLTEXT indexes used by the mysql backend of backend/services/text_search.py
+
+The combined index answers the WHERE clause; the single-column indexes are
+needed because MATCH() column lists must match an index exactly, and the
+per-field scores are what the field weights are applied to.
+"""
+from backend.migrations.helpers import add_index, is_mysql
+
+
+def upgrade():
+    if not is_mysql():
+        # SQLite/local runs use the in-process search index instead
+        return
+
+    add_index("recipes", "ft_recipes_search", "Name, ingredients, Description", "FULLTEXT")
+    add_index("recipes", "ft_recipes_name", "Name", "FULLTEXT")
+    add_index("recipes", "ft_recipes_ingredients", "ingredients", "FULLTEXT")
+    add_index("recipes", "ft_recipes_description", "Description", "FULLTEXT")
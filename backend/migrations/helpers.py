@@ -0,0 +1,46 @@
+"""
+Schema inspection helpers shared by the migrations
+"""
+from sqlalchemy import inspect, text
+
+from backend.databse import db
+
+
+def is_mysql():
+    return db.engine.dialect.name == 'mysql'
+
+
+def column_exists(table, column):
+    return any(c['name'] == column for c in inspect(db.engine).get_columns(table))
+
+
+def column_type(table, column):
+    """Upper-cased type of a column as the database reports it (None if missing)"""
+    for c in inspect(db.engine).get_columns(table):
+        if c['name'] == column:
+            return str(c['type']).upper()
+    return None
+
+
+def index_exists(table, name):
+    return any(i['name'] == name for i in inspect(db.engine).get_indexes(table))
+
+
+def add_column(table, column, ddl):
+    """ALTER TABLE ... ADD COLUMN unless the column is already there"""
+    if column_exists(table, column):
+        return False
+    db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return True
+
+
+def add_index(table, name, columns, kind=""):
+    """
+    CREATE [kind] INDEX unless it already exists.
+    kind is e.g. "UNIQUE" or "FULLTEXT".
+    """
+    if index_exists(table, name):
+        return False
+    prefix = f"{kind} " if kind else ""
+    db.session.execute(text(f"CREATE {prefix}INDEX {name} ON {table} ({columns})"))
+    return True
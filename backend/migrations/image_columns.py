@@ -0,0 +1,40 @@
+"""
+Parsed image columns on `recipes`
+
+Adds ImageUrl (primary image URL) and ImageList (JSON array) and backfills
+them from the R-style `Images` blob, so list endpoints select a short URL
+instead of parsing the blob on every read. New writes fill them through
+parsing.image_columns (approve_recipe / admin_update_recipe).
+"""
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.migrations.helpers import add_column
+from backend.services.parsing import image_columns
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    add_column("recipes", "ImageUrl", "VARCHAR(1024) NULL")
+    add_column("recipes", "ImageList", "JSON NULL")
+
+    # Backfill in primary-key batches
+    last_id = 0
+    while True:
+        rows = db.session.execute(text("""
+            SELECT RecipeId, Images
+            FROM recipes
+            WHERE RecipeId > :last_id AND ImageList IS NULL
+            ORDER BY RecipeId
+            LIMIT :limit
+        """), {"last_id": last_id, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        db.session.execute(
+            text("UPDATE recipes SET ImageUrl = :ImageUrl, ImageList = :ImageList WHERE RecipeId = :rid"),
+            [dict(image_columns(row[1]), rid=row[0]) for row in rows]
+        )
+        db.session.commit()
+        last_id = rows[-1][0]
@@ -0,0 +1,56 @@
+"""
+`ingredient_vocabulary` table: distinct normalized ingredients with the
+number of recipes using each (see backend/services/ingredient_vocabulary.py)
+
+The backfill only runs while the table is empty; afterwards the recipe
+write paths keep the counts current.
+
+On MySQL `name` uses the binary collation: names are normalized in Python,
+and the default accent/case-insensitive collation would treat distinct ones
+("jalapeño", "jalapeno") as the same key and fail the backfill.
+"""
+from collections import Counter
+
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.migrations.helpers import add_index, is_mysql
+from backend.services.ingredient_vocabulary import recipe_ingredients
+
+BATCH_SIZE = 1000
+
+
+def _name_collation():
+    return db.session.execute(text("""
+        SELECT COLLATION_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ingredient_vocabulary' AND COLUMN_NAME = 'name'
+    """)).scalar()
+
+
+def upgrade():
+    collate = "CHARACTER SET utf8mb4 COLLATE utf8mb4_bin" if is_mysql() else ""
+    db.session.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS ingredient_vocabulary (
+            name VARCHAR(255) {collate} NOT NULL PRIMARY KEY,
+            recipe_count INT NOT NULL DEFAULT 0
+        )
+    """))
+    # Tables created by the first version of this migration
+    if is_mysql() and _name_collation() != "utf8mb4_bin":
+        db.session.execute(text(f"ALTER TABLE ingredient_vocabulary MODIFY name VARCHAR(255) {collate} NOT NULL"))
+    add_index("ingredient_vocabulary", "idx_ingredient_vocabulary_count", "recipe_count")
+
+    if db.session.execute(text("SELECT COUNT(*) FROM ingredient_vocabulary")).scalar():
+        return
+
+    counts = Counter()
+    for row in db.session.execute(text("SELECT ingredients FROM recipes WHERE ingredients IS NOT NULL")):
+        counts.update(recipe_ingredients(row[0]))
+
+    rows = [{"name": name, "recipe_count": count} for name, count in counts.items()]
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(
+            text("INSERT INTO ingredient_vocabulary (name, recipe_count) VALUES (:name, :recipe_count)"),
+            rows[start:start + BATCH_SIZE]
+        )
+    db.session.commit()
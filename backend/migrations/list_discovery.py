@@ -0,0 +1,13 @@
+"""
+Public list discovery columns (see backend/services/public_lists.py)
+
+- RecipeLists.copy_count: times other users copied the list, used by the
+  popularity ranking
+- (is_public, list_id) index for loading the public lists
+"""
+from backend.migrations.helpers import add_column, add_index
+
+
+def upgrade():
+    add_column("RecipeLists", "copy_count", "INT NOT NULL DEFAULT 0")
+    add_index("RecipeLists", "idx_lists_public", "is_public, list_id")
@@ -0,0 +1,39 @@
+"""
+RecipeListItems join table (see backend/services/list_items.py)
+
+Creates the table and its indexes, then moves every list's ids out of the
+RecipeLists.recipe_ids JSON column into rows, keeping their order. Lists
+already moved have an empty column and are skipped.
+"""
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.migrations.helpers import add_index
+from backend.services import list_items
+
+
+def upgrade():
+    db.session.execute(text("""
+        CREATE TABLE IF NOT EXISTS RecipeListItems (
+            list_id INT NOT NULL,
+            recipe_id INT NOT NULL,
+            position INT NOT NULL,
+            added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (list_id, recipe_id),
+            FOREIGN KEY (list_id) REFERENCES RecipeLists (list_id) ON DELETE CASCADE
+        )
+    """))
+    add_index("RecipeListItems", "idx_list_items_position", "list_id, position")
+    add_index("RecipeListItems", "idx_list_items_recipe", "recipe_id, list_id")
+
+    rows = db.session.execute(text("SELECT list_id, recipe_ids FROM RecipeLists")).fetchall()
+    for list_id, value in rows:
+        ids = list_items.legacy_ids(value)
+        if not ids:
+            continue
+        list_items.add(list_id, ids)
+        db.session.execute(
+            text("UPDATE RecipeLists SET recipe_ids = '[]' WHERE list_id = :list_id"),
+            {"list_id": list_id}
+        )
+        db.session.commit()
@@ -0,0 +1,52 @@
+"""
+Typed nutrition columns on `recipes`
+
+Adds Calories, ProteinContent, FatContent and CarbohydrateContent as FLOAT
+columns with (column, RecipeId) indexes and backfills them from the
+NutritionFacts JSON, so the list endpoints' range filters (max_calories,
+min_protein, ...) are index range scans. New writes fill them through
+parsing.nutrition_columns (approve_recipe / admin_update_recipe).
+"""
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.migrations.helpers import add_column, add_index
+from backend.services.parsing import NUTRITION_FIELDS, nutrition_columns
+
+BATCH_SIZE = 1000
+
+INDEXES = {
+    "Calories": "idx_recipes_calories",
+    "ProteinContent": "idx_recipes_protein",
+    "FatContent": "idx_recipes_fat",
+    "CarbohydrateContent": "idx_recipes_carbs",
+}
+
+
+def upgrade():
+    for column in NUTRITION_FIELDS:
+        add_column("recipes", column, "FLOAT NULL")
+        add_index("recipes", INDEXES[column], f"{column}, RecipeId")
+
+    unset = " AND ".join(f"{column} IS NULL" for column in NUTRITION_FIELDS)
+    assignments = ", ".join(f"{column} = :{column}" for column in NUTRITION_FIELDS)
+
+    # Backfill in primary-key batches
+    last_id = 0
+    while True:
+        rows = db.session.execute(text(f"""
+            SELECT RecipeId, NutritionFacts
+            FROM recipes
+            WHERE RecipeId > :last_id AND NutritionFacts IS NOT NULL AND {unset}
+            ORDER BY RecipeId
+            LIMIT :limit
+        """), {"last_id": last_id, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        db.session.execute(
+            text(f"UPDATE recipes SET {assignments} WHERE RecipeId = :rid"),
+            [dict(nutrition_columns(row[1]), rid=row[0]) for row in rows]
+        )
+        db.session.commit()
+        last_id = rows[-1][0]
@@ -0,0 +1,11 @@
+"""
+Composite (AggregatedRating, RecipeId) index on `recipes`
+
+Turns the min_rating filter of the list endpoints and /api/recipes/query
+into an index range scan.
+"""
+from backend.migrations.helpers import add_index
+
+
+def upgrade():
+    add_index("recipes", "idx_recipes_rating", "AggregatedRating, RecipeId")
@@ -0,0 +1,28 @@
+"""
+Precomputed weighted rating on `recipes`
+
+Adds WeightedRating (see backend/services/weighted_rating.py) with a
+(WeightedRating, RecipeId) index for sort=top and scores every row that
+has no score yet. New writes fill it through weighted_rating.rating_columns
+(approve_recipe / admin_update_recipe).
+
+The column is DOUBLE, not FLOAT: sort=top cursors carry the score, and a
+single-precision value read back as text no longer equals the stored one,
+so the keyset seek would skip or repeat rows of a tie group. Databases
+that got the FLOAT column from the first version are widened in place.
+"""
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.migrations.helpers import add_column, add_index, column_type, is_mysql
+from backend.services import weighted_rating
+
+
+def upgrade():
+    add_column("recipes", "WeightedRating", "DOUBLE NULL")
+    if is_mysql() and not column_type("recipes", "WeightedRating").startswith("DOUBLE"):
+        db.session.execute(text("ALTER TABLE recipes MODIFY COLUMN WeightedRating DOUBLE NULL"))
+        # Scores already rounded to single precision are recomputed in full
+        weighted_rating.backfill(all_rows=True)
+    add_index("recipes", "idx_recipes_weighted_rating", "WeightedRating, RecipeId")
+    weighted_rating.backfill()
@@ -14,3 +14,18 @@ class Lists(db.Model):
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
     is_public = db.Column(db.Boolean, nullable=False, default=False)
+    copy_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ListItems(db.Model):
+    __tablename__ = "RecipeListItems"
+    __table_args__ = (
+        db.Index("idx_list_items_position", "list_id", "position"),
+        db.Index("idx_list_items_recipe", "recipe_id", "list_id"),
+        {'extend_existing': True},
+    )
+
+    list_id = db.Column(db.Integer, db.ForeignKey("RecipeLists.list_id", ondelete="CASCADE"), primary_key=True)
+    recipe_id = db.Column(db.Integer, primary_key=True)
+    position = db.Column(db.Integer, nullable=False)
+    added_at = db.Column(db.DateTime, server_default=db.func.now())
@@ -1,5 +1,5 @@
 from backend.databse import db
-from sqlalchemy.dialects.mysql import JSON
+from sqlalchemy.dialects.mysql import DOUBLE, JSON
 
 class Recipes(db.Model):
     __tablename__ = "recipes"
@@ -13,13 +13,25 @@ class Recipes(db.Model):
     CookTime = db.Column(db.String(50))
     PrepTime = db.Column(db.String(50))
     TotalTime = db.Column(db.String(50))
+    CookMinutes = db.Column(db.Integer)
+    PrepMinutes = db.Column(db.Integer)
+    TotalMinutes = db.Column(db.Integer)
     DatePublished = db.Column(db.DateTime)
     AggregatedRating = db.Column(db.Float)
     ReviewCount = db.Column(db.Integer)
+    WeightedRating = db.Column(DOUBLE)
     RecipeServings = db.Column(db.String(50))
     RecipeYield = db.Column(db.String(50))
     RecipeIngredientQuantities = db.Column(JSON)
     RecipeIngredientParts = db.Column(JSON)
     RecipeInstructions = db.Column(JSON)
     NutritionFacts = db.Column(JSON)
-    Images = db.Column(JSON)
\ No newline at end of file
+    Calories = db.Column(db.Float)
+    ProteinContent = db.Column(db.Float)
+    FatContent = db.Column(db.Float)
+    CarbohydrateContent = db.Column(db.Float)
+    Images = db.Column(JSON)
+    ImageUrl = db.Column(db.String(1024))
+    ImageList = db.Column(JSON)
+    CanonicalIngredients = db.Column(JSON)
+    CanonicalVersion = db.Column(db.Integer)
\ No newline at end of file
@@ -6,9 +6,33 @@ from sqlalchemy import text
 from backend.databse import db
 
 from backend.models.List import Lists
+from backend.services import counts, list_items, list_membership, public_lists
+from backend.services.pagination import decode_cursor, encode_cursor, page_info
+from backend.services.recipe_queries import fetch_cards, fetch_image_urls
 
 lists_bp = Blueprint('lists', __name__)
 
+# Cover images returned per list by /summary (default and maximum)
+SUMMARY_COVERS = 4
+MAX_SUMMARY_COVERS = 8
+
+# Most recipe IDs accepted by /membership
+MAX_MEMBERSHIP_RECIPES = 500
+
+# Lists returned by /top (default and maximum)
+TOP_LISTS = 20
+MAX_TOP_LISTS = 100
+
+
+def expand_recipes():
+    """True when the client asked for ?expand=recipes"""
+    return request.args.get("expand", "", type=str) == "recipes"
+
+
+def recipe_cards(recipe_ids):
+    """Recipe cards keyed by id, fetched in one batched query"""
+    return {card["id"]: card for card in fetch_cards(list(dict.fromkeys(recipe_ids)))}
+
 
 
 @lists_bp.route("/all",methods=['GET'])
@@ -16,10 +40,15 @@ def getAllListForUser():
     """
     Return all list IDs associated with the logged-in user.
 
+    Query params:
+    - expand: "recipes" also returns every list with its recipe cards,
+              fetched for all lists in one batched query
+
     Response:
     {
         "success": true,
-        "list_ids": [1, 2, 5, 10]
+        "list_ids": [1, 2, 5, 10],
+        "lists": [...]  # Only with expand=recipes
     }
     """
     user_id = session.get("user_id")
@@ -28,12 +57,81 @@ def getAllListForUser():
 
 
     try:
-        # Query all list IDs for this user
-        list_ids = [r.list_id for r in Lists.query.filter_by(owner_id=user_id).all()]
+        # All lists for this user with their recipe ids, in one query
+        user_lists = list_items.owner_lists(user_id)
+        list_ids = [r["list_id"] for r in user_lists]
 
-        return jsonify({
+        response = {
             "success": True,
             "list_ids": list_ids
+        }
+
+        if expand_recipes():
+            cards = recipe_cards([rid for r in user_lists for rid in r["recipe_ids"]])
+            response["lists"] = [
+                dict(r, recipes=[cards[rid] for rid in r["recipe_ids"] if rid in cards])
+                for r in user_lists
+            ]
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 500
+
+
+@lists_bp.route("/summary", methods=['GET'])
+def get_list_summaries():
+    """
+    Return every list of the logged-in user with what the "My Lists" screen
+    shows: title, recipe count, public flag and the first cover images.
+
+    Built from one query over RecipeLists (joined with their items) plus one
+    batched image lookup for all lists together.
+
+    Query params:
+    - covers: Cover image URLs per list (default: 4, max: 8)
+
+    Response:
+    {
+        "success": true,
+        "lists": [
+            {
+                "list_id": 5,
+                "title": "Dinner Ideas",
+                "recipe_count": 12,
+                "public": false,
+                "cover_images": ["https://...", ...]
+            }
+        ]
+    }
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "message": "Not logged in"}), 401
+
+    try:
+        covers = max(0, min(request.args.get("covers", SUMMARY_COVERS, type=int), MAX_SUMMARY_COVERS))
+
+        user_lists = list_items.owner_lists(user_id)
+
+        # Cover candidates are the first recipes of each list, in list order
+        cover_ids = {r["list_id"]: r["recipe_ids"][:covers] for r in user_lists}
+        images = fetch_image_urls([rid for ids in cover_ids.values() for rid in ids])
+
+        lists = [{
+            "list_id": r["list_id"],
+            "title": r["title"],
+            "recipe_count": len(r["recipe_ids"]),
+            "public": r["public"],
+            "cover_images": [images[rid] for rid in cover_ids[r["list_id"]] if rid in images]
+        } for r in user_lists]
+
+        return jsonify({
+            "success": True,
+            "lists": lists
         }), 200
 
     except Exception as e:
@@ -43,9 +141,68 @@ def getAllListForUser():
         }), 500
 
 
+@lists_bp.route("/membership", methods=["POST"])
+def get_list_membership():
+    """
+    For each recipe, the IDs of the logged-in user's lists that contain it
+    (drives the heart state on recipe cards without loading whole lists).
+
+    Served from a per-user membership map that is cached and dropped on
+    every change to the user's lists.
+
+    Expected JSON:
+    {
+        "recipe_ids": [38, 40, 41]   # max 500
+    }
+
+    Response:
+    {
+        "success": true,
+        "favorites_list_id": 3,
+        "memberships": {
+            "38": [3, 7],
+            "40": [],
+            "41": [7]
+        }
+    }
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "message": "Not logged in"}), 401
+
+    try:
+        data = request.get_json() or {}
+        recipe_ids = data.get("recipe_ids")
+
+        if isinstance(recipe_ids, int):
+            recipe_ids = [recipe_ids]
+        if not isinstance(recipe_ids, list) or not recipe_ids:
+            return jsonify({
+                "success": False,
+                "message": "recipe_ids must be a non-empty list or single integer"
+            }), 400
 
+        try:
+            recipe_ids = list(dict.fromkeys(int(rid) for rid in recipe_ids))
+        except (ValueError, TypeError):
+            return jsonify({"success": False, "message": "recipe_ids must be integers"}), 400
 
+        if len(recipe_ids) > MAX_MEMBERSHIP_RECIPES:
+            return jsonify({
+                "success": False,
+                "message": f"At most {MAX_MEMBERSHIP_RECIPES} recipe IDs per request"
+            }), 400
 
+        favorites_id, memberships = list_membership.lookup(user_id, recipe_ids)
+
+        return jsonify({
+            "success": True,
+            "favorites_list_id": favorites_id,
+            "memberships": {str(rid): list_ids for rid, list_ids in memberships.items()}
+        }), 200
+
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
 
 
 @lists_bp.route("/add", methods=["POST"])
@@ -74,11 +231,15 @@ def create_recipe_list():
         if new_ids is None:
             new_ids = []
 
-        # Ensure new_ids is a list
+        # Ensure new_ids is a list of integers
         if isinstance(new_ids, int):
             new_ids = [new_ids]
         elif not isinstance(new_ids, list):
             return jsonify({"success": False, "message": "recipe_ids must be a list or single integer"}), 400
+        try:
+            new_ids = [int(rid) for rid in new_ids]
+        except (ValueError, TypeError):
+            return jsonify({"success": False, "message": "recipe_ids must be a list or single integer"}), 400
 
         # Create new list
 
@@ -86,12 +247,17 @@ def create_recipe_list():
         recipe_list = Lists(
             owner_id=user_id,
             title=title or "Untitled List",
-            recipe_ids=new_ids,
+            recipe_ids=[],
             is_public=is_public
         )
 
         db.session.add(recipe_list)
+        db.session.flush()
+        list_items.add(recipe_list.list_id, new_ids)
         db.session.commit()
+        if recipe_list.is_public:
+            public_lists.invalidate()
+        list_membership.invalidate(user_id)
 
         return jsonify({
             "success": True,
@@ -99,7 +265,7 @@ def create_recipe_list():
             "list": {
                 "list_id": recipe_list.list_id,
                 "title": recipe_list.title,
-                "recipe_ids": recipe_list.recipe_ids,
+                "recipe_ids": list(dict.fromkeys(new_ids)),
                 "public": recipe_list.is_public
             }
         }), 201  # Use 201 Created for resource creation
@@ -139,19 +305,23 @@ def update_recipe_list(list_id):
         recipe_list = Lists.query.filter_by(list_id=list_id, owner_id=user_id).first()
         if not recipe_list:
             return jsonify({"success": False, "message": "List ID not found"}), 404
+        was_public = recipe_list.is_public
 
         # Handle recipe IDs update if they were provided
         if new_ids:
-            # Ensure new_ids is a list
+            # Ensure new_ids is a list of integers
             if isinstance(new_ids, int):
                 new_ids = [new_ids]
             elif not isinstance(new_ids, list):
                 return jsonify({"success": False, "message": "recipe_ids must be a list or single integer"}), 400
+            try:
+                new_ids = [int(rid) for rid in new_ids]
+            except (ValueError, TypeError):
+                return jsonify({"success": False, "message": "recipe_ids must be a list or single integer"}), 400
 
-            # Append new IDs without wiping existing ones and ensure uniqueness
-            existing_ids = recipe_list.recipe_ids or []
-            updated_ids = list(set(existing_ids + new_ids))
-            recipe_list.recipe_ids = updated_ids
+            # Append new IDs without wiping existing ones; ids already in the list are skipped
+            list_items.migrate(recipe_list)
+            list_items.add(list_id, new_ids)
 
         # Handle title update if it was provided
         if title_in_data:
@@ -161,6 +331,9 @@ def update_recipe_list(list_id):
             recipe_list.is_public = bool(data["public"])
 
         db.session.commit()
+        if was_public or recipe_list.is_public:
+            public_lists.invalidate()
+        list_membership.invalidate(user_id)
 
         return jsonify({
             "success": True,
@@ -168,7 +341,7 @@ def update_recipe_list(list_id):
             "list": {
                 "list_id": recipe_list.list_id,
                 "title": recipe_list.title,
-                "recipe_ids": recipe_list.recipe_ids,
+                "recipe_ids": list_items.recipe_ids(recipe_list),
                 "public": recipe_list.is_public
             }
         }), 200
@@ -178,6 +351,68 @@ def update_recipe_list(list_id):
         return jsonify({"success": False, "message": str(e)}), 500
 
 
+@lists_bp.route("/fork/<int:list_id>", methods=["POST"])
+def fork_recipe_list(list_id):
+    """
+    Copy a public list (or one of the user's own lists) into a new list owned
+    by the logged-in user. The copy happens inside the database in one
+    transaction; recipe ids are not sent to or from the client.
+
+    Optional JSON:
+    {
+        "title": "New title",   # default "Copy of <title>"
+        "public": false         # default false
+    }
+
+    Response:
+    {
+        "success": true,
+        "message": "List copied successfully",
+        "list_id": 42
+    }
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "message": "Not logged in"}), 401
+
+    try:
+        data = request.get_json(silent=True) or {}
+
+        source = Lists.query.filter_by(list_id=list_id).first()
+        if not source or (not source.is_public and source.owner_id != user_id):
+            return jsonify({"success": False, "message": "List not found or not accessible"}), 404
+
+        title = data.get("title")
+        if title is not None and not isinstance(title, str):
+            return jsonify({"success": False, "message": "title must be a string"}), 400
+        title = title or f"Copy of {source.title}"
+        is_public = bool(data.get("public", False))
+        new_id = list_items.fork(list_id, user_id, title[:255], is_public)
+
+        # Copies by other users feed the public list ranking
+        if source.owner_id != user_id:
+            db.session.execute(
+                text("UPDATE RecipeLists SET copy_count = copy_count + 1 WHERE list_id = :list_id"),
+                {"list_id": list_id}
+            )
+
+        db.session.commit()
+        # A public copy, or the source's copy_count, changes the ranking
+        if is_public or source.owner_id != user_id:
+            public_lists.invalidate()
+        list_membership.invalidate(user_id)
+
+        return jsonify({
+            "success": True,
+            "message": "List copied successfully",
+            "list_id": new_id
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "message": str(e)}), 500
+
+
 @lists_bp.route("/remove-recipes/<int:list_id>", methods=["PUT"])
 def remove_recipes_from_list(list_id):
     """
@@ -214,7 +449,7 @@ def remove_recipes_from_list(list_id):
                 "message": "No recipe IDs provided"
             }), 400
 
-        # Ensure remove_ids is a list
+        # Ensure remove_ids is a list of integers
         if isinstance(remove_ids, int):
             remove_ids = [remove_ids]
         elif not isinstance(remove_ids, list):
@@ -222,6 +457,13 @@ def remove_recipes_from_list(list_id):
                 "success": False,
                 "message": "recipe_ids must be a list or single integer"
             }), 400
+        try:
+            remove_ids = [int(rid) for rid in remove_ids]
+        except (ValueError, TypeError):
+            return jsonify({
+                "success": False,
+                "message": "recipe_ids must be a list or single integer"
+            }), 400
 
         # Get the list
         recipe_list = Lists.query.filter_by(list_id=list_id, owner_id=user_id).first()
@@ -232,11 +474,12 @@ def remove_recipes_from_list(list_id):
             }), 404
 
         # Remove specified recipe IDs
-        existing_ids = recipe_list.recipe_ids or []
-        updated_ids = [rid for rid in existing_ids if rid not in remove_ids]
-
-        recipe_list.recipe_ids = updated_ids
+        list_items.migrate(recipe_list)
+        list_items.remove(list_id, remove_ids)
         db.session.commit()
+        if recipe_list.is_public:
+            public_lists.invalidate()
+        list_membership.invalidate(user_id)
 
         return jsonify({
             "success": True,
@@ -244,7 +487,7 @@ def remove_recipes_from_list(list_id):
             "list": {
                 "list_id": recipe_list.list_id,
                 "title": recipe_list.title,
-                "recipe_ids": recipe_list.recipe_ids
+                "recipe_ids": list_items.recipe_ids(recipe_list)
             }
         }), 200
 
@@ -280,8 +523,13 @@ def delete_recipe_list(list_id):
         if not recipe_list:
             return jsonify({"success": False, "message": "List not found or not owned by user"}), 404
 
+        was_public = recipe_list.is_public
+        list_items.clear(list_id)
         db.session.delete(recipe_list)
         db.session.commit()
+        if was_public:
+            public_lists.invalidate()
+        list_membership.invalidate(user_id)
 
         return jsonify({
             "success": True,
@@ -304,6 +552,9 @@ def get_recipe_list(list_id):
     Example Request:
         GET /api/lists/12
 
+    Query params:
+    - expand: "recipes" adds the recipe cards in list order
+
     Response:
     {
         "success": true,
@@ -333,14 +584,19 @@ def get_recipe_list(list_id):
                 "message": "List not found or not accessible"
             }), 403
 
+        recipe_ids = list_items.recipe_ids(recipe_list)
+        list_data = {
+            "list_id": recipe_list.list_id,
+            "title": recipe_list.title,
+            "recipe_ids": recipe_ids,
+            "public": recipe_list.is_public
+        }
+        if expand_recipes():
+            list_data["recipes"] = fetch_cards(recipe_ids)
+
         return jsonify({
             "success": True,
-            "list": {
-                "list_id": recipe_list.list_id,
-                "title": recipe_list.title,
-                "recipe_ids": recipe_list.recipe_ids,
-                "public": recipe_list.is_public
-            }
+            "list": list_data
 
         }), 200
 
@@ -382,7 +638,7 @@ def generate_favorites_list():
                 "list": {
                     "list_id": existing_fav.list_id,
                     "title": existing_fav.title,
-                    "recipe_ids": existing_fav.recipe_ids
+                    "recipe_ids": list_items.recipe_ids(existing_fav)
                 }
             }), 200
 
@@ -394,6 +650,7 @@ def generate_favorites_list():
         )
         db.session.add(favorites_list)
         db.session.commit()
+        list_membership.invalidate(user_id)
 
         return jsonify({
             "success": True,
@@ -416,6 +673,9 @@ def get_favorites_list():
     """
     Return the Favorites list for the logged-in user.
 
+    Query params:
+    - expand: "recipes" adds the recipe cards in list order
+
     Response:
     {
         "success": true/false,
@@ -439,14 +699,19 @@ def get_favorites_list():
                 "message": "Favorites list not found"
             }), 404
 
+        recipe_ids = list_items.recipe_ids(favorites_list)
+        list_data = {
+            "id": favorites_list.list_id,
+            "title": favorites_list.title,
+            "recipe_ids": recipe_ids,
+            "public": favorites_list.is_public
+        }
+        if expand_recipes():
+            list_data["recipes"] = fetch_cards(recipe_ids)
+
         return jsonify({
             "success": True,
-            "list": {
-                "id": favorites_list.list_id,
-                "title": favorites_list.title,
-                "recipe_ids": favorites_list.recipe_ids,
-                "public": favorites_list.is_public
-            }
+            "list": list_data
         }), 200
 
     except Exception as e:
@@ -456,15 +721,33 @@ def get_favorites_list():
         }), 500
 
 
+def include_recipe_ids():
+    """True when the client asked for ?include=recipe_ids"""
+    return request.args.get("include", "", type=str) == "recipe_ids"
+
+
+def with_recipe_ids(summaries):
+    """Copies of list summaries with their recipe_ids, fetched in one query"""
+    ids = list_items.recipe_ids_for((s["list_id"], None) for s in summaries)
+    return [dict(s, recipe_ids=ids[s["list_id"]]) for s in summaries]
+
+
 @lists_bp.route('/search-public', methods=['GET'], strict_slashes=False)
 def search_public_lists():
     """
-    Search public recipe lists by title
+    Search public recipe lists by title, most popular first
+
+    Served from the in-memory public list index: every word of q must appear
+    in the title (the last one may be partially typed). Results are list
+    summaries; recipe ids come from /get/<list_id> or include=recipe_ids.
 
     Query params:
     - q: Search query (required)
     - page: Page number (default: 1)
     - per_page: Items per page (default: 20, max: 100)
+    - cursor: Opaque cursor from pagination.next_cursor (replaces page)
+    - include: "recipe_ids" adds each list's recipe ids
+    - include_total: false skips the total count (default: true)
 
     Example: /api/lists/search-public?q=dinner
     """
@@ -472,6 +755,7 @@ def search_public_lists():
         search_query = request.args.get('q', '', type=str)
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor', '', type=str)
 
         if not search_query:
             return jsonify({
@@ -482,47 +766,27 @@ def search_public_lists():
         per_page = min(per_page, 100)
         offset = (page - 1) * per_page
 
-        # Search only in public lists by title
-        query = text("""
-            SELECT list_id, title, recipe_ids, is_public
-            FROM RecipeLists
-            WHERE is_public = 1 AND title LIKE :search
-            LIMIT :limit OFFSET :offset
-        """)
-
-        search_param = f'%{search_query}%'
-        result = db.session.execute(query, {
-            'search': search_param,
-            'limit': per_page,
-            'offset': offset
-        })
-
-        lists = []
-        for row in result:
-            lists.append({
-                'list_id': row[0],
-                'title': row[1],
-                'recipe_ids': row[2],
-                'public': bool(row[3])
-            })
-
-        # Get total count of matching public lists
-        count_query = text("""
-            SELECT COUNT(*) FROM RecipeLists
-            WHERE is_public = 1 AND title LIKE :search
-        """)
-        total = db.session.execute(count_query, {'search': search_param}).scalar()
+        # Keyset seek past the last list of the previous page
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, 2, numeric=True)
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+
+        index = public_lists.get_lists()
+        lists, next_key, total = index.page(index.search(search_query), per_page, offset, after)
+        if include_recipe_ids():
+            lists = with_recipe_ids(lists)
 
         return jsonify({
             'success': True,
             'lists': lists,
             'query': search_query,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'total_pages': (total + per_page - 1) // per_page
-            }
+            'pagination': page_info(
+                page, per_page, total if counts.include_total() else None,
+                next_cursor=encode_cursor(*next_key) if next_key else None
+            )
         }), 200
 
 
@@ -532,3 +796,32 @@ def search_public_lists():
             'message': str(e)
         }), 500
 
+
+@lists_bp.route('/top', methods=['GET'], strict_slashes=False)
+def get_top_public_lists():
+    """
+    The most popular public lists (most copied, then largest) for the explore page
+
+    Query params:
+    - limit: Number of lists (default: 20, max: 100)
+    - include: "recipe_ids" adds each list's recipe ids
+
+    Example: /api/lists/top?limit=10
+    """
+    try:
+        limit = max(0, min(request.args.get('limit', TOP_LISTS, type=int), MAX_TOP_LISTS))
+
+        lists = public_lists.get_lists().top(limit)
+        if include_recipe_ids():
+            lists = with_recipe_ids(lists)
+
+        return jsonify({
+            'success': True,
+            'lists': lists
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
@@ -152,7 +152,7 @@ def get_meal_plan():
             r.Name,
             r.Description,
             r.CookTime,
-            r.Images
+            r.ImageUrl
         FROM meal_plans mp
         JOIN recipes r ON mp.RecipeId = r.RecipeId
         WHERE mp.userId = :user_id
@@ -179,7 +179,7 @@ def get_meal_plan():
                 "recipeName": row.Name,
                 "description": row.Description,
                 "cookTime": row.CookTime,
-                "imageUrl": row.Images  # ✅ ADDED
+                "imageUrl": row.ImageUrl  # ✅ ADDED
             }
             for row in rows
         ]
@@ -4,6 +4,7 @@ from sqlalchemy import text
 
 
 from backend.databse import db
+from backend.services import cookable, fuzzy_search, ingredient_vocabulary
 
 # Create a new blueprint for pantry routes
 pantry_bp = Blueprint('pantry', __name__)
@@ -125,6 +126,7 @@ def postPantryItems():
                 })
 
         db.session.commit()
+        cookable.invalidate(user_id)
 
         return jsonify({
             "success": True,
@@ -142,14 +144,20 @@ def postPantryItems():
 @pantry_bp.route('/search/ingredients', methods=['GET'], strict_slashes=False)
 def search_by_ingredients():
     """
-    Search recipes by ingredients.
+    Search the ingredient vocabulary.
+
+    Matches every distinct ingredient with a word starting with each word of
+    q ("salt" finds "sea salt", not "unsalted butter"), most used first, so
+    pages are stable and the total is exact. When fewer than a handful match,
+    similarly spelled ingredients are appended ("brocoli" -> "broccoli").
 
     Query params:
     - q: Search query (required)
     - page: Page number (default: 1)
     - per_page: Items per page (default: 20, max: 100)
+    - fuzzy: false disables the misspelling fallback (default: true)
 
-    Example: /api/recipes/search/ingredients?q=flour
+    Example: /api/pantry/search/ingredients?q=flour
     """
     try:
         search_query = request.args.get('q', '', type=str).strip()
@@ -165,49 +173,23 @@ def search_by_ingredients():
         per_page = min(per_page, 100)
         offset = (page - 1) * per_page
 
-        # This query searches for the search term in ingredients (comma-separated or space-separated)
-        # and ensures only unique matches (using DISTINCT)
-        query = text("""
-                     SELECT DISTINCT ingredients
-                     FROM recipes
-                     WHERE ingredients LIKE :search
-                         LIMIT :limit OFFSET :offset
-                     """)
-
-        search_param = f'%{search_query}%'
-        result = db.session.execute(query, {
-            'search': search_param,
-            'limit': per_page,
-            'offset': offset
-        })
+        all_matches = ingredient_vocabulary.search(search_query)
+
+        # Too few hits: append the closest spellings
+        fuzzy = False
+        if len(all_matches) < fuzzy_search.FUZZY_MIN_HITS and fuzzy_search.enabled():
+            similar = [name for name in fuzzy_search.ingredients(search_query) if name not in all_matches]
+            fuzzy = bool(similar)
+            all_matches += similar
 
-        matches = set()
-        for row in result:
-            # Split ingredients by comma and check each ingredient
-            for ingredient in row[0].split(','):
-                ingredient = ingredient.strip()
-                if search_query.lower() in ingredient.lower():
-                    matches.add(ingredient)
-
-        matches = list(matches)
-
-        # Get total count of unique matches
-        count_query = text("""
-                           SELECT COUNT(DISTINCT ingredient) FROM (
-                                                                      SELECT TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(ingredients, ',', n.n), ',', -1)) as ingredient
-                                                                      FROM recipes
-                                                                               CROSS JOIN (SELECT 1 as n UNION SELECT 2 UNION SELECT 3 UNION SELECT 4
-                                                                                           UNION SELECT 5 UNION SELECT 6 UNION SELECT 7 UNION SELECT 8
-                                                                                           UNION SELECT 9 UNION SELECT 10) n
-                                                                      WHERE ingredients LIKE :search
-                                                                  ) sub
-                           """)
-        total = db.session.execute(count_query, {'search': search_param}).scalar()
+        matches = all_matches[offset:offset + per_page]
+        total = len(all_matches)
 
         return jsonify({
             'success': True,
             'matches': matches,
             'query': search_query,
+            'fuzzy': fuzzy,
             'pagination': {
                 'page': page,
                 'per_page': per_page,
@@ -222,3 +204,46 @@ def search_by_ingredients():
             'message': f'Error searching recipes by ingredients: {str(e)}'
         }), 500
 
+
+@pantry_bp.route('/ingredients/autocomplete', methods=['GET'], strict_slashes=False)
+def autocomplete_ingredients():
+    """
+    Suggestions for the pantry "add item" box.
+
+    Ingredients starting with q come first, then ingredients with a word
+    starting with it, each group ordered by how many recipes use the ingredient. When nothing
+    matches, the most similarly spelled ingredients are returned instead.
+
+    Query params:
+    - q: What the user has typed so far
+    - limit: Number of suggestions (default: 10, max: 25)
+    - fuzzy: false disables the misspelling fallback (default: true)
+
+    Example: /api/pantry/ingredients/autocomplete?q=chick
+    """
+    try:
+        search_query = request.args.get('q', '', type=str)
+        limit = min(request.args.get('limit', ingredient_vocabulary.RESULT_SIZE, type=int), 25)
+
+        suggestions = [
+            {'name': name, 'recipeCount': count}
+            for name, count in ingredient_vocabulary.complete(search_query, limit)
+        ]
+
+        # Nothing contains what was typed: offer the closest spellings
+        if not suggestions and len(search_query.strip()) >= 3 and fuzzy_search.enabled():
+            suggestions = [
+                {'name': name, 'recipeCount': ingredient_vocabulary.recipe_count(name)}
+                for name in fuzzy_search.ingredients(search_query, limit)
+            ]
+
+        return jsonify({
+            'success': True,
+            'suggestions': suggestions
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching ingredient suggestions: {str(e)}'
+        }), 500
@@ -2,8 +2,18 @@
 Recipe routes - Browse, search, and retrieve recipes
 """
 from flask import Blueprint, jsonify, request, session
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from backend.databse import db
+from backend.services import (
+    catalog, category_index, cookable, counts, fuzzy_search, ingredient_index, ingredient_vocabulary,
+    name_autocomplete, random_sampler, recipe_cache, recipe_filters, recipe_query, recommender, text_search
+)
+from backend.services.ingredient_canon import canonical_columns
+from backend.services.pagination import decode_cursor, encode_cursor, page_info, seek_clause, split_page
+from backend.services.pantry_matcher import PantryMatcher, load_pantry_items, pantry_item_canonical
+from backend.services.parsing import duration_columns, image_columns, nutrition_columns, parse_list
+from backend.services.recipe_queries import SUMMARY_COLUMNS, fetch_cards, fetch_details, fetch_summaries
+from backend.services.weighted_rating import rating_columns
 import json
 import random
 
@@ -34,6 +44,21 @@ ALLOWED_RECIPE_FIELDS = [
     "ingredients",
 ]
 
+# Time strings that have integer-minute columns next to them
+TIME_FIELDS = {"CookTime", "PrepTime", "TotalTime"}
+
+# Rating columns the weighted rating is computed from
+RATING_FIELDS = {"AggregatedRating", "ReviewCount"}
+
+# Most recipe IDs accepted by POST /missing-ingredients
+MAX_BATCH_RECIPES = 200
+
+# Most recipe IDs accepted by /batch
+MAX_BATCH_FETCH = 300
+
+# Most missing ingredients /cookable accepts
+MAX_COOKABLE_MISSING = 5
+
 def init_recipes_routes(database):
     """Initialize the recipes routes with database connection"""
 
@@ -46,13 +71,32 @@ def get_recipes():
     Query params:
     - page: Page number (default: 1)
     - per_page: Items per page (default: 20, max: 100)
+    - cursor: Opaque cursor from pagination.next_cursor; when given, page is
+              ignored and the next page is read with an index seek
+    - include_total: false skips the total count (default: true)
+    - min_rating: Lowest AggregatedRating
+    - min_calories, max_calories, min_protein, max_protein, min_fat, max_fat,
+      min_carbs, max_carbs: Nutrition range filters (per serving); recipes
+      without the value recorded are left out
+    - min_total_minutes, max_total_minutes: Total time range filter
+    - sort: id (default), time (quickest first; recipes without a
+            recorded time are left out) or top (best weighted rating
+            first, see backend/services/weighted_rating.py)
     
-    Example: /api/recipes?page=1&per_page=20
+    Example: /api/recipes?page=1&per_page=20&max_calories=500&min_protein=20
+    Example: /api/recipes?max_total_minutes=30&sort=time
     """
     try:
         # Get pagination parameters
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor', '', type=str)
+        
+        try:
+            filters = recipe_filters.from_request()
+            sort = recipe_filters.sort_from_request()
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
         # Limit per_page to prevent excessive queries
         per_page = min(per_page, 100)
@@ -60,19 +104,55 @@ def get_recipes():
         # Calculate offset
         offset = (page - 1) * per_page
         
-        # Query recipes
-        query = text("""
-            SELECT RecipeId, Name, AuthorName, Description, 
-                   RecipeCategory, AggregatedRating, ReviewCount,
-                   Images
-            FROM recipes
-            LIMIT :limit OFFSET :offset
-        """)
+        # Keyset seek past the last row of the previous page
+        sort_columns = recipe_filters.sort_columns(sort)
+        seek = ''
+        params = {'limit': per_page + 1, 'offset': offset}
+        if cursor:
+            try:
+                seek, seek_params = seek_clause(
+                    sort_columns, decode_cursor(cursor, len(sort_columns)), recipe_filters.sort_descending(sort)
+                )
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+            params.update(seek_params)
+            params['offset'] = 0
+        
+        # Range filters and sorts: indexed scans on the typed columns, total from the count cache
+        if filters or sort != recipe_filters.DEFAULT_SORT:
+            filter_sql, filter_params = recipe_filters.where(filters)
+            params.update(filter_params)
+            where = ' AND '.join(p for p in (filter_sql, recipe_filters.sort_where(sort)) if p)
+            rows, has_more, total = counts.fetch_page(
+                f"{SUMMARY_COLUMNS}, {', '.join(sort_columns)}", 'recipes', where,
+                recipe_filters.order_by(sort), params, per_page,
+                counts.RECIPES, ('filters', sort, recipe_filters.cache_key(filters)),
+                with_total=counts.include_total(), seek=seek
+            )
+            next_cursor = encode_cursor(*rows[-1][8:8 + len(sort_columns)]) if has_more else None
+        else:
+            where = f'WHERE {seek}' if seek else ''
+            
+            # Query recipes
+            query = text(f"""
+                SELECT RecipeId, Name, AuthorName, Description, 
+                       RecipeCategory, AggregatedRating, ReviewCount,
+                       ImageUrl
+                FROM recipes
+                {where}
+                ORDER BY RecipeId
+                LIMIT :limit OFFSET :offset
+            """)
+            
+            rows, has_more = split_page(db.session.execute(query, params), per_page)
+            next_cursor = encode_cursor(rows[-1][0]) if has_more else None
+            
+            # Total comes from the maintained recipe counter, not a COUNT(*)
+            total = counts.recipe_total() if counts.include_total() else None
         
-        result = db.session.execute(query, {'limit': per_page, 'offset': offset})
         recipes = []
         
-        for row in result:
+        for row in rows:
             recipes.append({
                 'id': row[0],
                 'name': row[1],
@@ -81,22 +161,13 @@ def get_recipes():
                 'category': row[4],
                 'rating': float(row[5]) if row[5] else None,
                 'reviewCount': row[6],
-                'image': row[7].split(',')[0].strip('c("').strip('"') if row[7] else None
+                'image': row[7]
             })
         
-        # Get total count for pagination info
-        count_query = text("SELECT COUNT(*) FROM recipes")
-        total = db.session.execute(count_query).scalar()
-        
         return jsonify({
             'success': True,
             'recipes': recipes,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'total_pages': (total + per_page - 1) // per_page
-            }
+            'pagination': page_info(page, per_page, total, next_cursor=next_cursor)
         }), 200
         
     except Exception as e:
@@ -115,56 +186,15 @@ def get_recipe(recipe_id):
     Example: /api/recipes/38
     """
     try:
-        query = text("""
-            SELECT RecipeId, Name, AuthorName, Description,
-                   RecipeCategory, Keywords, CookTime, PrepTime, TotalTime,
-                   DatePublished, AggregatedRating, ReviewCount, 
-                   RecipeServings, RecipeYield,
-                   RecipeIngredientQuantities, RecipeIngredientParts,
-                   RecipeInstructions, NutritionFacts, Images ,ingredients
-            FROM recipes
-            WHERE RecipeId = :recipe_id
-        """)
+        # Popular recipes are served from the recipe cache
+        recipe = fetch_details([recipe_id]).get(recipe_id)
 
-        result = db.session.execute(query, {'recipe_id': recipe_id}).fetchone()
-
-        if not result:
+        if not recipe:
             return jsonify({
                 'success': False,
                 'message': 'Recipe not found'
             }), 404
 
-        # Unpack in order of SELECT columns
-        recipe = {
-            'id': result[0],
-            'name': result[1],
-            'author': result[2],
-            'description': result[3],
-            'category': result[4],
-            'keywords': result[5],
-            'cookTime': result[6],
-            'prepTime': result[7],
-            'totalTime': result[8],
-            'datePublished': result[9],
-            'rating': float(result[10]) if result[10] else None,
-            'reviewCount': result[11],
-            'servings': result[12],
-            'yield': result[13],
-            'quantities': result[14],
-            'ingredients': result[15],
-            'ingredientsParts': result[19],
-            'instructions': result[16],
-            'nutritionFacts': result[17],  # likely a JSON string
-            'images': result[18]
-        }
-
-        # Optionally parse NutritionFacts if it's JSON
-        try:
-            if recipe['nutritionFacts']:
-                recipe['nutritionFacts'] = json.loads(recipe['nutritionFacts'])
-        except Exception:
-            pass  # leave as string if not JSON
-
         return jsonify({
             'success': True,
             'recipe': recipe
@@ -176,15 +206,81 @@ def get_recipe(recipe_id):
             'message': f'Error fetching recipe: {str(e)}'
         }), 500
 
+@recipes_bp.route('/batch', methods=['GET', 'POST'], strict_slashes=False)
+def get_recipes_batch():
+    """
+    Get many recipes in one request (list, favorites and meal-plan hydration)
+    
+    Query params (GET) or JSON body (POST):
+    - ids: Recipe IDs, comma separated for GET or a list for POST (max 300)
+    - view: "summary" (default, recipe cards) or "full" (same payload as /api/recipes/<id>)
+    
+    Example: /api/recipes/batch?ids=38,40,41&view=summary
+    
+    Returns recipes in the order requested, plus the IDs that were not found.
+    """
+    try:
+        if request.method == 'POST':
+            data = request.get_json() or {}
+            raw_ids = data.get('ids')
+            view = data.get('view', 'summary')
+        else:
+            raw_ids = [i for i in request.args.get('ids', '', type=str).split(',') if i.strip()]
+            view = request.args.get('view', 'summary', type=str)
+        
+        if isinstance(raw_ids, int):
+            raw_ids = [raw_ids]
+        if not isinstance(raw_ids, list) or not raw_ids:
+            return jsonify({'success': False, 'message': 'ids is required'}), 400
+        
+        try:
+            recipe_ids = list(dict.fromkeys(int(rid) for rid in raw_ids))
+        except (ValueError, TypeError):
+            return jsonify({'success': False, 'message': 'ids must be integers'}), 400
+        
+        if len(recipe_ids) > MAX_BATCH_FETCH:
+            return jsonify({
+                'success': False,
+                'message': f'At most {MAX_BATCH_FETCH} recipe IDs per request'
+            }), 400
+        
+        if view not in ('summary', 'full'):
+            return jsonify({'success': False, 'message': 'view must be "summary" or "full"'}), 400
+        
+        # Cached payloads are reused; the rest come from one primary-key IN query
+        if view == 'full':
+            found = fetch_details(recipe_ids)
+            recipes = [found[rid] for rid in recipe_ids if rid in found]
+        else:
+            recipes = fetch_cards(recipe_ids)
+        
+        returned = {recipe['id'] for recipe in recipes}
+        return jsonify({
+            'success': True,
+            'recipes': recipes,
+            'not_found': [rid for rid in recipe_ids if rid not in returned]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching recipes: {str(e)}'
+        }), 500
+
 @recipes_bp.route('/search', methods=['GET'], strict_slashes=False)
 def search_recipes():
     """
-    Search recipes by name or ingredient
+    Search recipes by name or ingredient, best matches first
     
     Query params:
-    - q: Search query (searches in name, description, ingredients)
+    - q: Search query (searches in name, description, ingredients;
+         name matches rank above ingredient matches above description matches)
     - page: Page number (default: 1)
     - per_page: Items per page (default: 20)
+    - include_total: false skips the total count (default: true)
+    - fuzzy: false disables the misspelling fallback (default: true); when
+             the query has too few hits it is re-run with the closest known
+             spellings and the response carries fuzzy/suggestion
     
     Example: /api/recipes/search?q=chicken&page=1
     """
@@ -202,57 +298,30 @@ def search_recipes():
         per_page = min(per_page, 100)
         offset = (page - 1) * per_page
         
-        # Search in name, description, and ingredients
-        query = text("""
-            SELECT RecipeId, Name, AuthorName, Description,
-                   RecipeCategory, AggregatedRating, ReviewCount, Images
-            FROM recipes
-            WHERE Name LIKE :search
-               OR Description LIKE :search
-               OR RecipeIngredientParts LIKE :search
-            LIMIT :limit OFFSET :offset
-        """)
+        # Ranked search over name, ingredients and description
+        recipe_ids, total = text_search.search(search_query, per_page, offset, counts.include_total())
         
-        search_param = f'%{search_query}%'
-        result = db.session.execute(query, {
-            'search': search_param,
-            'limit': per_page,
-            'offset': offset
-        })
+        # Too few hits: retry with misspelled words corrected
+        suggestion = None
+        hits = total if total is not None else len(recipe_ids) if page == 1 else None
+        if hits is not None and hits < fuzzy_search.FUZZY_MIN_HITS and fuzzy_search.enabled():
+            corrected = fuzzy_search.correct(search_query)
+            if corrected and corrected != ' '.join(search_query.lower().split()):
+                fuzzy_ids, fuzzy_total = text_search.search(corrected, per_page, offset, counts.include_total())
+                if len(fuzzy_ids) > len(recipe_ids):
+                    recipe_ids, total, suggestion = fuzzy_ids, fuzzy_total, corrected
         
-        recipes = []
-        for row in result:
-            recipes.append({
-                'id': row[0],
-                'name': row[1],
-                'author': row[2],
-                'description': row[3],
-                'category': row[4],
-                'rating': float(row[5]) if row[5] else None,
-                'reviewCount': row[6],
-                'image': row[7]
-            })
-        
-        # Get count of search results
-        count_query = text("""
-            SELECT COUNT(*) FROM recipes
-            WHERE Name LIKE :search
-               OR Description LIKE :search
-               OR RecipeIngredientParts LIKE :search
-        """)
-        total = db.session.execute(count_query, {'search': search_param}).scalar()
+        recipes = fetch_summaries(recipe_ids)
         
-        return jsonify({
+        response = {
             'success': True,
             'recipes': recipes,
             'query': search_query,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'total_pages': (total + per_page - 1) // per_page
-            }
-        }), 200
+            'pagination': page_info(page, per_page, total)
+        }
+        if suggestion:
+            response.update(fuzzy=True, suggestion=suggestion)
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({
@@ -267,7 +336,8 @@ def search_by_ingredients():
     Search recipes by ingredients only
     
     Query params:
-    - q: Ingredient search query (searches only in RecipeIngredientParts)
+    - q: Ingredient search query (every word must appear in the recipe's
+         ingredients; the last word may be partially typed)
     - page: Page number (default: 1)
     - per_page: Items per page (default: 20)
     
@@ -287,52 +357,17 @@ def search_by_ingredients():
         per_page = min(per_page, 100)
         offset = (page - 1) * per_page
         
-        # Search ONLY in ingredients
-        query = text("""
-            SELECT RecipeId, Name, AuthorName, Description,
-                   RecipeCategory, AggregatedRating, ReviewCount, Images
-            FROM recipes
-            WHERE RecipeIngredientParts LIKE :search
-            LIMIT :limit OFFSET :offset
-        """)
+        # Search ONLY in ingredients, via the in-memory ingredient index
+        recipe_ids = ingredient_index.search(search_query)
+        total = len(recipe_ids)
         
-        search_param = f'%{search_query}%'
-        result = db.session.execute(query, {
-            'search': search_param,
-            'limit': per_page,
-            'offset': offset
-        })
-        
-        recipes = []
-        for row in result:
-            recipes.append({
-                'id': row[0],
-                'name': row[1],
-                'author': row[2],
-                'description': row[3],
-                'category': row[4],
-                'rating': float(row[5]) if row[5] else None,
-                'reviewCount': row[6],
-                'image': row[7]
-            })
-        
-        # Get count of search results
-        count_query = text("""
-            SELECT COUNT(*) FROM recipes
-            WHERE RecipeIngredientParts LIKE :search
-        """)
-        total = db.session.execute(count_query, {'search': search_param}).scalar()
+        recipes = fetch_summaries(recipe_ids[offset:offset + per_page])
         
         return jsonify({
             'success': True,
             'recipes': recipes,
             'query': search_query,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'total_pages': (total + per_page - 1) // per_page
-            }
+            'pagination': page_info(page, per_page, total)
         }), 200
         
     except Exception as e:
@@ -352,6 +387,14 @@ def search_by_name():
     - q: Search query (required)
     - page: Page number (default: 1)
     - per_page: Items per page (default: 20, max: 100)
+    - cursor: Opaque cursor from pagination.next_cursor (replaces page)
+    - include_total: false skips the total count (default: true)
+    - fuzzy: false disables the misspelling fallback (default: true); when
+             the name matches too few recipes, recipes with similarly spelled
+             names follow the exact matches, ranked by similarity (not
+             applied together with range filters or another sort)
+    - min_rating ... max_total_minutes: Range filters, as on /api/recipes
+    - sort: id (default), time or top, as on /api/recipes
     
     Example: /api/recipes/search/name?q=lasagna
     """
@@ -359,6 +402,7 @@ def search_by_name():
         search_query = request.args.get('q', '', type=str)
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor', '', type=str)
         
         if not search_query:
             return jsonify({
@@ -366,27 +410,69 @@ def search_by_name():
                 'message': 'Search query is required'
             }), 400
         
+        try:
+            filters = recipe_filters.from_request()
+            sort = recipe_filters.sort_from_request()
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
         per_page = min(per_page, 100)
         offset = (page - 1) * per_page
         
-        # Search ONLY in Name
-        query = text("""
-            SELECT RecipeId, Name, AuthorName, Description,
-                   RecipeCategory, AggregatedRating, ReviewCount, Images
-            FROM recipes
-            WHERE Name LIKE :search
-            LIMIT :limit OFFSET :offset
-        """)
-        
         search_param = f'%{search_query}%'
-        result = db.session.execute(query, {
-            'search': search_param,
-            'limit': per_page,
-            'offset': offset
-        })
+        filter_sql, filter_params = recipe_filters.where(filters)
+        params = dict(filter_params, search=search_param, offset=offset)
+        
+        # Keyset seek past the last row of the previous page
+        sort_columns = recipe_filters.sort_columns(sort)
+        seek = ''
+        if cursor:
+            try:
+                seek, seek_params = seek_clause(
+                    sort_columns, decode_cursor(cursor, len(sort_columns)), recipe_filters.sort_descending(sort)
+                )
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+            params.update(seek_params)
+            params['offset'] = 0
+        
+        # Search ONLY in Name; the total rides along with the page or comes from the count cache
+        where = ' AND '.join(p for p in ('Name LIKE :search', filter_sql, recipe_filters.sort_where(sort)) if p)
+        rows, has_more, total = counts.fetch_page(
+            f"{SUMMARY_COLUMNS}, {', '.join(sort_columns)}", 'recipes', where,
+            recipe_filters.order_by(sort), params, per_page,
+            counts.RECIPES, ('name', counts.normalize(search_query), sort, recipe_filters.cache_key(filters)),
+            with_total=counts.include_total(), seek=seek
+        )
+        
+        # Too few exact hits: exact matches first, then similarly spelled names
+        exact_total = total if total is not None else len(rows) if page == 1 and not has_more else None
+        if (not cursor and not filters and sort == recipe_filters.DEFAULT_SORT
+                and exact_total is not None and exact_total < fuzzy_search.FUZZY_MIN_HITS
+                and fuzzy_search.enabled()):
+            fuzzy_ids, suggestion = fuzzy_search.recipe_names(search_query)
+            if page == 1 and not has_more:
+                exact_ids = [row[0] for row in rows]
+            else:
+                exact_ids = [row[0] for row in db.session.execute(
+                    text("SELECT RecipeId FROM recipes WHERE Name LIKE :search ORDER BY RecipeId"),
+                    {'search': search_param}
+                )]
+            seen = set(exact_ids)
+            recipe_ids = exact_ids + [rid for rid in fuzzy_ids if rid not in seen]
+            
+            if len(recipe_ids) > len(exact_ids):
+                return jsonify({
+                    'success': True,
+                    'recipes': fetch_cards(recipe_ids[offset:offset + per_page]),
+                    'query': search_query,
+                    'fuzzy': True,
+                    'suggestion': suggestion,
+                    'pagination': page_info(page, per_page, len(recipe_ids), next_cursor=None)
+                }), 200
         
         recipes = []
-        for row in result:
+        for row in rows:
             recipes.append({
                 'id': row[0],
                 'name': row[1],
@@ -398,20 +484,14 @@ def search_by_name():
                 'image': row[7]
             })
         
-        # Get total count
-        count_query = text("SELECT COUNT(*) FROM recipes WHERE Name LIKE :search")
-        total = db.session.execute(count_query, {'search': search_param}).scalar()
-        
         return jsonify({
             'success': True,
             'recipes': recipes,
             'query': search_query,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'total_pages': (total + per_page - 1) // per_page
-            }
+            'pagination': page_info(
+                page, per_page, total,
+                next_cursor=encode_cursor(*rows[-1][8:8 + len(sort_columns)]) if has_more else None
+            )
         }), 200
         
     except Exception as e:
@@ -420,22 +500,60 @@ def search_by_name():
             'message': f'Error searching recipes by name: {str(e)}'
         }), 500
 
+@recipes_bp.route('/autocomplete', methods=['GET'], strict_slashes=False)
+def autocomplete_recipe_names():
+    """
+    Typeahead suggestions for recipe names, most popular first
+    
+    Answered from an in-memory word index; every word of q must appear in the
+    name and the last one may be partially typed.
+    
+    Query params:
+    - q: What the user has typed so far
+    
+    Example: /api/recipes/autocomplete?q=chicken alf
+    """
+    try:
+        search_query = request.args.get('q', '', type=str)
+        
+        return jsonify({
+            'success': True,
+            'suggestions': name_autocomplete.suggest(search_query) if search_query.strip() else []
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching suggestions: {str(e)}'
+        }), 500
+
 @recipes_bp.route('/category', methods=['GET'], strict_slashes=False)
 def get_recipes_by_category():
     """
     Get recipes filtered by category
     
+    Served from the in-memory category facets: an exact category name
+    (case-insensitive) returns that category, any other name returns every
+    category containing it.
+    
     Query params:
     - name: Category name (e.g., "Beverages", "Dessert", "Main Dish")
     - page: Page number (default: 1)
     - per_page: Items per page (default: 20, max: 100)
+    - cursor: Opaque cursor from pagination.next_cursor (replaces page)
+    - include_total: false skips the total count (default: true)
+    - min_rating ... max_total_minutes: Range filters, as on /api/recipes
+    - sort: id (default), time (quickest first) or top (best weighted
+            rating first); filtered or sorted pages come from SQL
     
     Example: /api/recipes/category?name=Beverages&page=1
+    Example: /api/recipes/category?name=Dessert&sort=top
     """
     try:
         category_name = request.args.get('name', '', type=str)
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor', '', type=str)
         
         if not category_name:
             return jsonify({
@@ -443,55 +561,62 @@ def get_recipes_by_category():
                 'message': 'Category name is required'
             }), 400
         
+        try:
+            filters = recipe_filters.from_request()
+            sort = recipe_filters.sort_from_request()
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
         per_page = min(per_page, 100)
         offset = (page - 1) * per_page
         
-        # Filter by category
-        query = text("""
-            SELECT RecipeId, Name, AuthorName, Description,
-                   RecipeCategory, AggregatedRating, ReviewCount, Images
-            FROM recipes
-            WHERE RecipeCategory LIKE :category
-            LIMIT :limit OFFSET :offset
-        """)
-        
-        category_param = f'%{category_name}%'
-        result = db.session.execute(query, {
-            'category': category_param,
-            'limit': per_page,
-            'offset': offset
-        })
+        # Keyset seek past the last row of the previous page
+        sort_columns = recipe_filters.sort_columns(sort)
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, len(sort_columns))
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
         
-        recipes = []
-        for row in result:
-            recipes.append({
-                'id': row[0],
-                'name': row[1],
-                'author': row[2],
-                'description': row[3],
-                'category': row[4],
-                'rating': float(row[5]) if row[5] else None,
-                'reviewCount': row[6],
-                'image': row[7]
-            })
+        categories = category_index.resolve(category_name)
         
-        # Get count of recipes in this category
-        count_query = text("""
-            SELECT COUNT(*) FROM recipes
-            WHERE RecipeCategory LIKE :category
-        """)
-        total = db.session.execute(count_query, {'category': category_param}).scalar()
+        if (filters or sort != recipe_filters.DEFAULT_SORT) and categories:
+            # Range filters and sorts need the typed columns, so this page comes from SQL
+            filter_sql, params = recipe_filters.where(filters)
+            names = {f'category{i}': name for i, name in enumerate(categories)}
+            params.update(names, offset=0 if after is not None else offset)
+            seek = ''
+            if after is not None:
+                seek, seek_params = seek_clause(sort_columns, after, recipe_filters.sort_descending(sort))
+                params.update(seek_params)
+            
+            where = ' AND '.join(p for p in (
+                f"RecipeCategory IN ({', '.join(':' + key for key in names)})",
+                filter_sql,
+                recipe_filters.sort_where(sort)
+            ) if p)
+            rows, has_more, total = counts.fetch_page(
+                ', '.join(sort_columns), 'recipes', where,
+                recipe_filters.order_by(sort), params, per_page,
+                counts.RECIPES, ('category', tuple(categories), sort, recipe_filters.cache_key(filters)),
+                with_total=counts.include_total(), seek=seek
+            )
+            recipe_ids = [row[len(sort_columns) - 1] for row in rows]
+            next_cursor = encode_cursor(*rows[-1][:len(sort_columns)]) if has_more else None
+        else:
+            recipe_ids, has_more, total = category_index.page(
+                categories, per_page, offset, after[0] if after is not None else None
+            )
+            next_cursor = encode_cursor(recipe_ids[-1]) if has_more else None
         
         return jsonify({
             'success': True,
-            'recipes': recipes,
+            'recipes': fetch_cards(recipe_ids),
             'category': category_name,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'total_pages': (total + per_page - 1) // per_page
-            }
+            'pagination': page_info(
+                page, per_page, total if counts.include_total() else None, next_cursor=next_cursor
+            )
         }), 200
         
     except Exception as e:
@@ -500,6 +625,102 @@ def get_recipes_by_category():
             'message': f'Error fetching recipes by category: {str(e)}'
         }), 500
 
+@recipes_bp.route('/categories', methods=['GET'], strict_slashes=False)
+def get_categories():
+    """
+    List every recipe category with its recipe count, largest first
+    
+    Query params:
+    - limit: Only return the first N categories (default: all)
+    
+    Example: /api/recipes/categories?limit=20
+    """
+    try:
+        limit = request.args.get('limit', 0, type=int)
+        
+        categories = category_index.categories()
+        if limit > 0:
+            categories = categories[:limit]
+        
+        return jsonify({
+            'success': True,
+            'categories': [{'name': name, 'count': count} for name, count in categories]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching categories: {str(e)}'
+        }), 500
+
+@recipes_bp.route('/query', methods=['GET'], strict_slashes=False)
+def query_recipes():
+    """
+    Recipes meeting every given condition, in one request
+    
+    The planner in backend/services/recipe_query.py starts from the most
+    selective condition (ingredient postings, category facets or a range
+    index) and narrows it with the others.
+    
+    Query params:
+    - category: Category name, resolved as on /category
+    - include: Comma separated ingredients that must all be in the recipe
+    - exclude: Comma separated ingredients that must not be in the recipe
+    - min_rating ... max_total_minutes: Range filters, as on /api/recipes
+    - sort: id (default), time or top, as on /api/recipes
+    - per_page: Items per page (default: 20, max: 100)
+    - cursor: Opaque cursor from pagination.next_cursor
+    - include_total: false skips the total count (default: true); the total
+                     is also null when it would take a full scan to count
+    
+    Example: /api/recipes/query?category=Dessert&include=chocolate,eggs&exclude=walnuts&max_total_minutes=45&sort=time
+    """
+    try:
+        category_name = request.args.get('category', '', type=str).strip()
+        include = [term.strip() for term in request.args.get('include', '', type=str).split(',') if term.strip()]
+        exclude = [term.strip() for term in request.args.get('exclude', '', type=str).split(',') if term.strip()]
+        per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+        cursor = request.args.get('cursor', '', type=str)
+        
+        try:
+            filters = recipe_filters.from_request()
+            sort = recipe_filters.sort_from_request()
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, len(recipe_filters.sort_columns(sort)), numeric=True)
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+        
+        recipe_ids, next_key, total = recipe_query.run(
+            category=category_name,
+            include=include,
+            exclude=exclude,
+            filters=filters,
+            sort=sort,
+            limit=per_page,
+            after=after,
+            with_total=counts.include_total()
+        )
+        
+        return jsonify({
+            'success': True,
+            'recipes': fetch_cards(recipe_ids),
+            'pagination': page_info(
+                1, per_page, total,
+                next_cursor=encode_cursor(*next_key) if next_key else None
+            )
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error querying recipes: {str(e)}'
+        }), 500
+
 @recipes_bp.route('/admin/update/<int:recipe_id>', methods=['PUT'])
 def admin_update_recipe(recipe_id):
     """
@@ -531,6 +752,40 @@ def admin_update_recipe(recipe_id):
         if not updates:
             return jsonify({"success": False, "message": "No valid fields to update"}), 400
 
+        # Keep the parsed image columns in step with Images
+        if "Images" in updates:
+            updates.update(image_columns(updates["Images"]))
+
+        # ...and the typed nutrition columns with NutritionFacts
+        if "NutritionFacts" in updates:
+            updates.update(nutrition_columns(updates["NutritionFacts"]))
+
+        # ...and the canonical ingredient names with the ingredients
+        if "ingredients" in updates:
+            updates.update(canonical_columns(updates["ingredients"]))
+
+        # ...and the minute columns with any of the three time strings
+        if TIME_FIELDS & updates.keys():
+            current = db.session.execute(
+                text("SELECT CookTime, PrepTime, TotalTime FROM recipes WHERE RecipeId = :rid"),
+                {"rid": recipe_id}
+            ).fetchone()
+            if current is not None:
+                times = dict(zip(("CookTime", "PrepTime", "TotalTime"), current))
+                times.update((k, v) for k, v in updates.items() if k in TIME_FIELDS)
+                updates.update(duration_columns(times["CookTime"], times["PrepTime"], times["TotalTime"]))
+
+        # ...and the weighted rating with AggregatedRating / ReviewCount
+        if RATING_FIELDS & updates.keys():
+            current = db.session.execute(
+                text("SELECT AggregatedRating, ReviewCount FROM recipes WHERE RecipeId = :rid"),
+                {"rid": recipe_id}
+            ).fetchone()
+            if current is not None:
+                updates.update(rating_columns(
+                    updates.get("AggregatedRating", current[0]), updates.get("ReviewCount", current[1])
+                ))
+
         # Build dynamic SET clause
         set_clauses = []
         params = {"rid": recipe_id}
@@ -545,13 +800,25 @@ def admin_update_recipe(recipe_id):
             WHERE RecipeId = :rid
         """
 
+        # Previous ingredients, for the vocabulary counts
+        old = None
+        if "ingredients" in updates:
+            old = db.session.execute(
+                text("SELECT ingredients FROM recipes WHERE RecipeId = :rid"),
+                {"rid": recipe_id}
+            ).fetchone()
+
         result = db.session.execute(text(sql), params)
 
         if result.rowcount == 0:
             db.session.rollback()
             return jsonify({"success": False, "message": "Recipe not found"}), 404
 
+        if old is not None:
+            ingredient_vocabulary.record_change(old[0], updates["ingredients"])
+
         db.session.commit()
+        catalog.recipe_changed(recipe_id)
         return jsonify({"success": True, "message": "Recipe updated successfully"}), 200
 
     except Exception as e:
@@ -574,6 +841,11 @@ def admin_delete_recipe(recipe_id):
         if not is_admin:
             return jsonify({"success": False, "message": "Admin only"}), 403
 
+        old = db.session.execute(
+            text("SELECT ingredients FROM recipes WHERE RecipeId = :rid"),
+            {"rid": recipe_id}
+        ).fetchone()
+
         result = db.session.execute(
             text("DELETE FROM recipes WHERE RecipeId = :rid"),
             {"rid": recipe_id}
@@ -583,7 +855,10 @@ def admin_delete_recipe(recipe_id):
             db.session.rollback()
             return jsonify({"success": False, "message": "Recipe not found"}), 404
 
+        ingredient_vocabulary.record_change(old[0], None)
+
         db.session.commit()
+        catalog.recipe_deleted(recipe_id)
         return jsonify({"success": True, "message": "Recipe deleted successfully"}), 200
 
     except Exception as e:
@@ -591,6 +866,19 @@ def admin_delete_recipe(recipe_id):
         print("Error deleting recipe:", e)
         return jsonify({"success": False, "message": str(e)}), 500
 
+@recipes_bp.route('/admin/cache-stats', methods=['GET'])
+def admin_cache_stats():
+    """
+    Admin-only: hit/miss counters of the recipe detail cache
+    """
+    if not session.get("user_id"):
+        return jsonify({"success": False, "message": "Not logged in"}), 401
+
+    if not session.get("admin"):
+        return jsonify({"success": False, "message": "Admin only"}), 403
+
+    return jsonify({"success": True, "stats": recipe_cache.stats()}), 200
+
 @recipes_bp.route('/random', methods=['GET'], strict_slashes=False)
 def get_random_recipes():
     """
@@ -605,28 +893,9 @@ def get_random_recipes():
         count = request.args.get('count', 10, type=int)
         count = min(count, 50)  # Limit to 50
         
-        query = text("""
-            SELECT RecipeId, Name, AuthorName, Description,
-                   RecipeCategory, AggregatedRating, ReviewCount, Images
-            FROM recipes
-            ORDER BY RAND()
-            LIMIT :count
-        """)
-        
-        result = db.session.execute(query, {'count': count})
-        recipes = []
-        
-        for row in result:
-            recipes.append({
-                'id': row[0],
-                'name': row[1],
-                'author': row[2],
-                'description': row[3],
-                'category': row[4],
-                'rating': float(row[5]) if row[5] else None,
-                'reviewCount': row[6],
-                'image': row[7]
-            })
+        # Draw ids from the cached id pool and fetch them by primary key
+        recipe_ids = random_sampler.sample(random_sampler.ALL, count)
+        recipes = fetch_summaries(recipe_ids)
         
         return jsonify({
             'success': True,
@@ -661,23 +930,7 @@ def get_recommendations():
         
         if not pantry_result or not pantry_result[0]:
             # No pantry items - return random recipes
-            random_query = text("""
-                SELECT RecipeId, Name, Images, AggregatedRating, RecipeCategory
-                FROM recipes
-                WHERE Images IS NOT NULL AND Images != ''
-                ORDER BY RAND()
-                LIMIT 12
-            """)
-            random_recipes = db.session.execute(random_query).fetchall()
-            
-            recipes_list = [{
-                "id": r[0],
-                "name": r[1],
-                "images": r[2],
-                "rating": r[3],
-                "category": r[4],
-                "matchCount": 0
-            } for r in random_recipes]
+            recipes_list = recommender.random_cards(12)
             
             return jsonify({
                 "success": True,
@@ -685,29 +938,15 @@ def get_recommendations():
                 "message": "No pantry items found, showing random recipes"
             }), 200
         
-        # Parse pantry items (stored as JSON array)
+        # Parse pantry items (stored as JSON array) into their canonical names
         pantry_items = json.loads(pantry_result[0])
-        pantry_ingredients = [item["name"].lower().strip() for item in pantry_items]
+        pantry_ingredients = list(dict.fromkeys(
+            name for name in (pantry_item_canonical(item) for item in pantry_items) if name
+        ))
         
         if not pantry_ingredients:
             # Empty pantry - return random recipes
-            random_query = text("""
-                SELECT RecipeId, Name, Images, AggregatedRating, RecipeCategory
-                FROM recipes
-                WHERE Images IS NOT NULL AND Images != ''
-                ORDER BY RAND()
-                LIMIT 12
-            """)
-            random_recipes = db.session.execute(random_query).fetchall()
-            
-            recipes_list = [{
-                "id": r[0],
-                "name": r[1],
-                "images": r[2],
-                "rating": r[3],
-                "category": r[4],
-                "matchCount": 0
-            } for r in random_recipes]
+            recipes_list = recommender.random_cards(12)
             
             return jsonify({
                 "success": True,
@@ -715,60 +954,20 @@ def get_recommendations():
                 "message": "Empty pantry, showing random recipes"
             }), 200
         
-        # Get all recipes with ingredients field
-        recipes_query = text("""
-            SELECT RecipeId, Name, Images, AggregatedRating, RecipeCategory, ingredients
-            FROM recipes
-            WHERE ingredients IS NOT NULL 
-            AND ingredients != ''
-            AND Images IS NOT NULL 
-            AND Images != ''
-        """)
-        all_recipes = db.session.execute(recipes_query).fetchall()
+        # Score recipes against the pantry with the in-memory ingredient matrix;
+        # only the top 30 are fetched from the database
+        top = recommender.top_matches(pantry_ingredients, 30)
+        cards = recommender.fetch_cards([recipe_id for recipe_id, _ in top])
         
-        # Score each recipe based on matching ingredients
         scored_recipes = []
-        for recipe in all_recipes:
-            recipe_id, name, images, rating, category, ingredients_parts = recipe
-            
-            if not ingredients_parts:
-                continue
-            
-            # Parse recipe ingredients (comma-separated string)
-            recipe_ingredients = [ing.lower().strip() for ing in ingredients_parts.split(',')]
-            
-            # Count matches
-            match_count = 0
-            for pantry_item in pantry_ingredients:
-                for recipe_ingredient in recipe_ingredients:
-                    # Check if pantry item is in recipe ingredient
-                    # e.g., "chicken" matches "chicken breast"
-                    if pantry_item in recipe_ingredient or recipe_ingredient in pantry_item:
-                        match_count += 1
-                        break  # Count each pantry item only once per recipe
-            
-            if match_count > 0:
-                scored_recipes.append({
-                    "id": recipe_id,
-                    "name": name,
-                    "images": images,
-                    "rating": rating,
-                    "category": category,
-                    "matchCount": match_count
-                })
-        
-        # Sort by match count (descending)
-        scored_recipes.sort(key=lambda x: x["matchCount"], reverse=True)
+        for recipe_id, match_count in top:
+            if recipe_id in cards:
+                scored_recipes.append(dict(cards[recipe_id], matchCount=match_count))
         
         # Add some randomization while maintaining priority
-        # Take top 30 matches, shuffle them, then take top 12
+        # Shuffle the top 30 matches, then take 12
         # This gives variety while still prioritizing good matches
-        if len(scored_recipes) > 30:
-            top_matches = scored_recipes[:30]
-            random.shuffle(top_matches)
-            final_recipes = top_matches[:12]
-        elif len(scored_recipes) > 12:
-            # Shuffle all and take 12
+        if len(scored_recipes) > 12:
             random.shuffle(scored_recipes)
             final_recipes = scored_recipes[:12]
         else:
@@ -776,24 +975,8 @@ def get_recommendations():
             final_recipes = scored_recipes
             needed = 12 - len(final_recipes)
             if needed > 0:
-                random_query = text("""
-                    SELECT RecipeId, Name, Images, AggregatedRating, RecipeCategory
-                    FROM recipes
-                    WHERE Images IS NOT NULL AND Images != ''
-                    ORDER BY RAND()
-                    LIMIT :limit
-                """)
-                random_recipes = db.session.execute(random_query, {"limit": needed}).fetchall()
-                
-                for r in random_recipes:
-                    final_recipes.append({
-                        "id": r[0],
-                        "name": r[1],
-                        "images": r[2],
-                        "rating": r[3],
-                        "category": r[4],
-                        "matchCount": 0
-                    })
+                matched_ids = {r["id"] for r in final_recipes}
+                final_recipes.extend(recommender.random_cards(needed, matched_ids))
         
         return jsonify({
             "success": True,
@@ -808,6 +991,71 @@ def get_recommendations():
             "message": f"Error: {str(e)}"
         }), 500
     
+@recipes_bp.route('/cookable', methods=['GET'])
+def get_cookable_recipes():
+    """
+    Recipes the user can cook with what is in their pantry
+    
+    Answered from the in-memory ingredient matrix (see
+    backend/services/cookable.py); only the returned page is read from
+    the database. The match list is cached per user, so later pages are
+    slices of it.
+    
+    Query params:
+    - max_missing: Ingredients a recipe may need beyond the pantry
+                   (default: 0, max: 5)
+    - page: Page number (default: 1)
+    - per_page: Items per page (default: 20, max: 100)
+    
+    Each recipe carries missingCount and missing (the ingredient names to buy).
+    
+    Example: /api/recipes/cookable?max_missing=2
+    Requires login to access user's pantry
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "message": "Not logged in"}), 401
+    
+    try:
+        max_missing = request.args.get('max_missing', 0, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        
+        if not 0 <= max_missing <= MAX_COOKABLE_MISSING:
+            return jsonify({
+                "success": False,
+                "message": f"max_missing must be between 0 and {MAX_COOKABLE_MISSING}"
+            }), 400
+        
+        pantry_items = load_pantry_items(user_id)
+        covered = cookable.covered_ingredients(pantry_items)
+        matches = cookable.cached_find(user_id, covered, max_missing)
+        
+        offset = (page - 1) * per_page
+        selected = dict(matches[offset:offset + per_page])
+        
+        recipes = []
+        for card in fetch_cards(list(selected)):
+            recipes.append(dict(
+                card,
+                missingCount=selected[card['id']],
+                missing=cookable.missing_ingredients(card['id'], covered) if selected[card['id']] else []
+            ))
+        
+        return jsonify({
+            "success": True,
+            "recipes": recipes,
+            "pantryItems": pantry_items,
+            "pagination": page_info(page, per_page, len(matches))
+        }), 200
+        
+    except Exception as e:
+        print(f"Error finding cookable recipes: {str(e)}")
+        return jsonify({
+            "success": False,
+            "message": f"Error: {str(e)}"
+        }), 500
+
 @recipes_bp.route('/<int:recipe_id>/missing-ingredients', methods=['GET'])
 def get_missing_ingredients(recipe_id):
     """
@@ -823,51 +1071,7 @@ def get_missing_ingredients(recipe_id):
     """
     user_id = session.get("user_id")
     
-    # Allow non-logged-in users - just return all ingredients as missing
-    if not user_id:
-        try:
-            # Get recipe ingredients
-            recipe_query = text("""
-                SELECT RecipeIngredientParts 
-                FROM recipes 
-                WHERE RecipeId = :recipe_id
-            """)
-            recipe_result = db.session.execute(recipe_query, {"recipe_id": recipe_id}).fetchone()
-            
-            if not recipe_result or not recipe_result[0]:
-                return jsonify({
-                    "success": False,
-                    "message": "Recipe not found or has no ingredients"
-                }), 404
-            
-            # Parse recipe ingredients
-            recipe_ingredients = [ing.strip() for ing in recipe_result[0].split(',')]
-            
-            return jsonify({
-                "success": True,
-                "missing_ingredients": recipe_ingredients,
-                "pantry_items": [],
-                "recipe_ingredients": recipe_ingredients,
-                "message": "Login to track pantry items"
-            }), 200
-            
-        except Exception as e:
-            return jsonify({
-                "success": False,
-                "message": f"Error: {str(e)}"
-            }), 500
-    
-    # Logged in user - compare with pantry
     try:
-        # Get user's pantry items
-        pantry_query = text("SELECT items FROM pantry WHERE user_id = :user_id")
-        pantry_result = db.session.execute(pantry_query, {"user_id": user_id}).fetchone()
-        
-        pantry_items = []
-        if pantry_result and pantry_result[0]:
-            pantry_data = json.loads(pantry_result[0])
-            pantry_items = [item["name"].lower().strip() for item in pantry_data]
-        
         # Get recipe ingredients
         recipe_query = text("""
             SELECT RecipeIngredientParts 
@@ -882,29 +1086,26 @@ def get_missing_ingredients(recipe_id):
                 "message": "Recipe not found or has no ingredients"
             }), 404
         
-        # Parse recipe ingredients (comma-separated string)
-        recipe_ingredients = [ing.strip() for ing in recipe_result[0].split(',')]
+        recipe_ingredients = parse_list(recipe_result[0])
         
-        # Find missing ingredients
-        missing = []
-        for recipe_ing in recipe_ingredients:
-            recipe_ing_lower = recipe_ing.lower()
-            
-            # Check if any pantry item matches this recipe ingredient
-            found = False
-            for pantry_item in pantry_items:
-                # Check for partial matches (e.g., "chicken" matches "chicken breast")
-                if pantry_item in recipe_ing_lower or recipe_ing_lower in pantry_item:
-                    found = True
-                    break
-            
-            if not found:
-                missing.append(recipe_ing)
+        # Allow non-logged-in users - just return all ingredients as missing
+        if not user_id:
+            return jsonify({
+                "success": True,
+                "missing_ingredients": recipe_ingredients,
+                "pantry_items": [],
+                "recipe_ingredients": recipe_ingredients,
+                "message": "Login to track pantry items"
+            }), 200
+        
+        # Logged in user - compare with pantry
+        matcher = PantryMatcher(load_pantry_items(user_id))
+        missing, present = matcher.split(recipe_ingredients)
         
         return jsonify({
             "success": True,
             "missing_ingredients": missing,
-            "pantry_items": [item for item in recipe_ingredients if item not in missing],
+            "pantry_items": present,
             "recipe_ingredients": recipe_ingredients
         }), 200
         
@@ -913,4 +1114,93 @@ def get_missing_ingredients(recipe_id):
         return jsonify({
             "success": False,
             "message": f"Error: {str(e)}"
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@recipes_bp.route('/missing-ingredients', methods=['POST'])
+def get_missing_ingredients_batch():
+    """
+    Missing / present ingredients for many recipes in one request.
+    The pantry is loaded once and all recipes are fetched in one query.
+    
+    Expected JSON:
+    {
+        "recipe_ids": [38, 40, 41]   # max 200
+    }
+    
+    Returns:
+    {
+        "success": true,
+        "results": {
+            "38": {
+                "missing_ingredients": ["chicken breast"],
+                "pantry_items": ["onion", "garlic"],
+                "recipe_ingredients": ["chicken breast", "onion", "garlic"]
+            },
+            ...
+        },
+        "not_found": [41]
+    }
+    """
+    user_id = session.get("user_id")
+    
+    try:
+        data = request.get_json() or {}
+        recipe_ids = data.get("recipe_ids")
+        
+        if isinstance(recipe_ids, int):
+            recipe_ids = [recipe_ids]
+        if not isinstance(recipe_ids, list) or not recipe_ids:
+            return jsonify({
+                "success": False,
+                "message": "recipe_ids must be a non-empty list or single integer"
+            }), 400
+        
+        try:
+            recipe_ids = list(dict.fromkeys(int(rid) for rid in recipe_ids))
+        except (ValueError, TypeError):
+            return jsonify({"success": False, "message": "recipe_ids must be integers"}), 400
+        
+        if len(recipe_ids) > MAX_BATCH_RECIPES:
+            return jsonify({
+                "success": False,
+                "message": f"At most {MAX_BATCH_RECIPES} recipe IDs per request"
+            }), 400
+        
+        recipes_query = text("""
+            SELECT RecipeId, RecipeIngredientParts
+            FROM recipes
+            WHERE RecipeId IN :ids
+        """).bindparams(bindparam('ids', expanding=True))
+        rows = db.session.execute(recipes_query, {"ids": recipe_ids}).fetchall()
+        ingredients_by_id = {row[0]: parse_list(row[1]) for row in rows if row[1]}
+        
+        matcher = PantryMatcher(load_pantry_items(user_id))
+        
+        results = {}
+        for rid in recipe_ids:
+            if rid not in ingredients_by_id:
+                continue
+            recipe_ingredients = ingredients_by_id[rid]
+            missing, present = matcher.split(recipe_ingredients)
+            results[str(rid)] = {
+                "missing_ingredients": missing,
+                "pantry_items": present,
+                "recipe_ingredients": recipe_ingredients
+            }
+        
+        response = {
+            "success": True,
+            "results": results,
+            "not_found": [rid for rid in recipe_ids if rid not in ingredients_by_id]
+        }
+        if not user_id:
+            response["message"] = "Login to track pantry items"
+        return jsonify(response), 200
+        
+    except Exception as e:
+        print(f"Error checking missing ingredients: {str(e)}")
+        return jsonify({
+            "success": False,
+            "message": f"Error: {str(e)}"
+        }), 500
@@ -11,6 +11,10 @@ import json
 import random
 
 from backend.models.User import User
+from backend.services import catalog, ingredient_vocabulary
+from backend.services.ingredient_canon import canonical_columns
+from backend.services.parsing import duration_columns, image_columns, nutrition_columns
+from backend.services.weighted_rating import rating_columns
 
 user_made_recipes_bp = Blueprint('user_made_recipes', __name__)
 
@@ -356,20 +360,22 @@ def approve_recipe(user_recipe_id):
         recipe_data = json.loads(row.recipe_data)
 
         # Insert into main recipes table
-        db.session.execute(
+        result = db.session.execute(
             text("""
                 INSERT INTO recipes (
                     Name, AuthorName, Description, RecipeCategory, Keywords,
-                    PrepTime, CookTime, TotalTime, DatePublished,
-                    AggregatedRating, ReviewCount, RecipeServings, RecipeYield,
+                    PrepTime, CookTime, TotalTime, CookMinutes, PrepMinutes, TotalMinutes, DatePublished,
+                    AggregatedRating, ReviewCount, WeightedRating, RecipeServings, RecipeYield,
                     RecipeIngredientQuantities, RecipeIngredientParts, RecipeInstructions,
-                    NutritionFacts, Images, ingredients
+                    NutritionFacts, Calories, ProteinContent, FatContent, CarbohydrateContent,
+                    Images, ImageUrl, ImageList, ingredients, CanonicalIngredients, CanonicalVersion
                 ) VALUES (
                     :Name, :AuthorName, :Description, :RecipeCategory, :Keywords,
-                    :PrepTime, :CookTime, :TotalTime, :DatePublished,
-                    :AggregatedRating, :ReviewCount, :RecipeServings, :RecipeYield,
+                    :PrepTime, :CookTime, :TotalTime, :CookMinutes, :PrepMinutes, :TotalMinutes, :DatePublished,
+                    :AggregatedRating, :ReviewCount, :WeightedRating, :RecipeServings, :RecipeYield,
                     :RecipeIngredientQuantities, :RecipeIngredientParts, :RecipeInstructions,
-                    :NutritionFacts, :Images, :ingredients
+                    :NutritionFacts, :Calories, :ProteinContent, :FatContent, :CarbohydrateContent,
+                    :Images, :ImageUrl, :ImageList, :ingredients, :CanonicalIngredients, :CanonicalVersion
                 )
             """),
             {
@@ -381,23 +387,34 @@ def approve_recipe(user_recipe_id):
                 "PrepTime": recipe_data.get("prepTime", ""),
                 "CookTime": recipe_data.get("cookTime", ""),
                 "TotalTime": recipe_data.get("totalTime", ""),
+                **duration_columns(
+                    recipe_data.get("cookTime", ""), recipe_data.get("prepTime", ""), recipe_data.get("totalTime", "")
+                ),
                 "DatePublished": recipe_data.get("datePublished", ""),
                 "AggregatedRating": recipe_data.get("rating"),
                 "ReviewCount": recipe_data.get("reviewCount"),
+                **rating_columns(recipe_data.get("rating"), recipe_data.get("reviewCount")),
                 "RecipeServings": recipe_data.get("servings", ""),
                 "RecipeYield": recipe_data.get("yield", ""),
                 "RecipeIngredientQuantities": json.dumps([i.get("amount", "") for i in recipe_data.get("ingredients", [])]),
                 "RecipeIngredientParts": json.dumps([i.get("unit", "") for i in recipe_data.get("ingredients", [])]),
                 "RecipeInstructions": json.dumps(recipe_data.get("instructions", [])),
                 "NutritionFacts": json.dumps(recipe_data.get("nutrition", {})),
+                **nutrition_columns(recipe_data.get("nutrition", {})),
                 "Images": recipe_data.get("image_url", ""),
+                **image_columns(recipe_data.get("image_url", "")),
                 "ingredients": json.dumps([i.get("ingredient", "") for i in recipe_data.get("ingredients", [])]),
+                **canonical_columns([i.get("ingredient", "") for i in recipe_data.get("ingredients", [])]),
             }
         )
+        ingredient_vocabulary.record_change(
+            None, [i.get("ingredient", "") for i in recipe_data.get("ingredients", [])]
+        )
 
         # Delete from user_made_recipes
         db.session.execute(text("DELETE FROM user_made_recipes WHERE id=:rid"), {"rid": user_recipe_id})
         db.session.commit()
+        catalog.recipe_added(result.lastrowid)
 
         return jsonify({"success": True, "message": "Recipe approved and moved to main recipes table"})
 
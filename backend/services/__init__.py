@@ -0,0 +1,4 @@
+"""
+Services package initialization
+"""
+# In-memory indexes and helpers shared by the route blueprints
@@ -0,0 +1,73 @@
+"""
+Catalog change notifications
+
+Routes that write to the `recipes` table call recipe_added, recipe_changed
+or recipe_deleted after committing. In-memory indexes register a listener
+here so they can update themselves for that one recipe instead of being
+rebuilt.
+"""
+from flask import current_app
+
+# Events passed to listeners
+ADDED = 'added'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+_listeners = []
+_warmers = []
+
+
+def register(listener, warmer=None):
+    """
+    Register an index with the catalog.
+
+    listener(recipe_id, event) is called after every committed write, with
+    event one of ADDED, UPDATED or DELETED.
+    warmer() builds the index and is called once on startup.
+    """
+    _listeners.append(listener)
+    if warmer is not None:
+        _warmers.append(warmer)
+
+
+def recipe_added(recipe_id):
+    """Notify indexes that a recipe was inserted"""
+    _notify(recipe_id, ADDED)
+
+
+def recipe_changed(recipe_id):
+    """Notify indexes that a recipe was updated"""
+    _notify(recipe_id, UPDATED)
+
+
+def recipe_deleted(recipe_id):
+    """Notify indexes that a recipe was removed"""
+    _notify(recipe_id, DELETED)
+
+
+def _notify(recipe_id, event):
+    for listener in _listeners:
+        try:
+            listener(recipe_id, event)
+        except Exception as e:
+            # The write already committed; a stale index entry is refreshed on the next rebuild
+            print(f"Error updating index for recipe {recipe_id}: {e}")
+
+
+def warm():
+    """Build every registered index (called from app startup)"""
+    for warmer in _warmers:
+        try:
+            warmer()
+        except Exception as e:
+            print(f"Error warming index {warmer.__module__}: {e}")
+
+
+def index_ttl():
+    """
+    Seconds an in-memory index may live before it is rebuilt.
+
+    Each gunicorn worker only sees the writes it handled itself, so indexes
+    are periodically rebuilt to pick up changes made through other workers.
+    """
+    return current_app.config.get("CATALOG_INDEX_TTL", 600)
@@ -0,0 +1,129 @@
+"""
+Category facets for the category browse endpoints
+
+Keeps RecipeCategory -> sorted array of RecipeIds in memory. A category
+page is a slice of those arrays followed by a primary-key fetch, and the
+per-category counts are just the array lengths, so browsing never scans or
+counts the recipes table.
+
+A recipe has exactly one category, so the facets are disjoint: a name that
+matches several categories (the old LIKE '%name%' behaviour) is served by
+merging their arrays and its total is the sum of their lengths.
+"""
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services import catalog
+
+_facets = {}
+_built_at = None
+_lock = threading.Lock()
+
+
+def normalize(name):
+    return ' '.join(str(name).lower().split())
+
+
+def build():
+    """(Re)load the facets with one scan of (RecipeCategory, RecipeId)"""
+    global _facets, _built_at
+
+    with _lock:
+        rows = db.session.execute(text("""
+            SELECT RecipeCategory, RecipeId
+            FROM recipes
+            WHERE RecipeCategory IS NOT NULL AND RecipeCategory != ''
+            ORDER BY RecipeId
+        """))
+        facets = {}
+        for category, recipe_id in rows:
+            facets.setdefault(category, array('i')).append(recipe_id)
+
+        _facets = facets
+        _built_at = time.monotonic()
+
+
+def get_facets():
+    if _built_at is None or time.monotonic() - _built_at > catalog.index_ttl():
+        build()
+    return _facets
+
+
+def categories():
+    """[(category, recipe count)], largest first"""
+    facets = get_facets()
+    return sorted(
+        ((category, len(ids)) for category, ids in facets.items()),
+        key=lambda item: (-item[1], item[0])
+    )
+
+
+def resolve(name):
+    """
+    Categories served for a requested name: the exact category when one
+    matches (case-insensitively), otherwise every category containing it.
+    """
+    key = normalize(name)
+    facets = get_facets()
+    exact = [category for category in facets if normalize(category) == key]
+    if exact:
+        return exact
+    return sorted(category for category in facets if key in normalize(category))
+
+
+def page(category_names, limit, offset=0, after=None):
+    """
+    Return (recipe_ids, has_more, total) for the merged facets, ordered by RecipeId.
+
+    after: last RecipeId of the previous page (keyset); offset is ignored then
+    """
+    facets = get_facets()
+    postings = [facets[name] for name in category_names if name in facets]
+    total = sum(len(ids) for ids in postings)
+
+    def tail(ids):
+        start = bisect_right(ids, after) if after is not None else 0
+        return (ids[i] for i in range(start, len(ids)))
+
+    merged = heapq.merge(*[tail(ids) for ids in postings])
+    start = 0 if after is not None else offset
+    recipe_ids = list(islice(merged, start, start + limit + 1))
+    return recipe_ids[:limit], len(recipe_ids) > limit, total
+
+
+def _remove(recipe_id):
+    for category, ids in list(_facets.items()):
+        pos = bisect_left(ids, recipe_id)
+        if pos < len(ids) and ids[pos] == recipe_id:
+            del ids[pos]
+            if not ids:
+                del _facets[category]
+            return
+
+
+def _on_recipe_change(recipe_id, event):
+    if _built_at is None:
+        return
+
+    row = None
+    if event != catalog.DELETED:
+        row = db.session.execute(
+            text("SELECT RecipeCategory FROM recipes WHERE RecipeId = :rid"),
+            {"rid": recipe_id}
+        ).fetchone()
+
+    with _lock:
+        _remove(recipe_id)
+        if row is not None and row[0]:
+            ids = _facets.setdefault(row[0], array('i'))
+            ids.insert(bisect_left(ids, recipe_id), recipe_id)
+
+
+catalog.register(_on_recipe_change, build)
@@ -0,0 +1,100 @@
+"""
+"Cookable now": recipes whose ingredients the pantry already covers
+
+With the pantry resolved to the set P of ingredient ids it covers, a recipe
+with ingredient set R is cookable with k missing items when |R| - |R & P| <= k.
+|R & P| comes from walking the matrix columns of P once (a sparse count,
+touching only recipes that share an ingredient with the pantry), and |R|
+is the row size. Recipes sharing nothing with the pantry qualify only when
+|R| <= k, which the matrix's size index lists directly.
+
+The sorted match list is cached per user and max_missing together with
+the covered set and the matrix generation it was computed from, so pages
+2..n are slices of it. An entry is recomputed when the pantry covers a
+different set or the matrix was rebuilt or changed since; pantry writes
+drop the user's entries (invalidate). Per worker, like the matrix itself.
+"""
+from flask import current_app
+
+from backend.services import ingredient_matrix
+from backend.services.recipe_cache import LRUCache
+
+_backend = None
+
+
+def _cache():
+    global _backend
+    if _backend is None:
+        config = current_app.config
+        _backend = LRUCache(
+            config.get('RECIPE_CACHE_MAX_ENTRIES', 5000),
+            config.get('RECIPE_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+            config.get('COOKABLE_CACHE_TTL', 300)
+        )
+    return _backend
+
+
+def covered_ingredients(pantry_items):
+    """Ingredient ids covered by at least one pantry item"""
+    matrix = ingredient_matrix.get_matrix()
+    covered = set()
+    for item in pantry_items:
+        covered.update(matrix.match(item))
+    return covered
+
+
+def find(covered, max_missing=0):
+    """
+    Return [(recipe_id, missing count)] for recipes missing at most
+    max_missing ingredients outside the covered ids, fewest missing first,
+    then the recipes using the most pantry ingredients, then by id.
+    """
+    matrix = ingredient_matrix.get_matrix()
+
+    hits = {}
+    for ingredient_id in covered:
+        for recipe_id in matrix.columns[ingredient_id]:
+            hits[recipe_id] = hits.get(recipe_id, 0) + 1
+
+    matches = []
+    for recipe_id, count in hits.items():
+        missing = len(matrix.rows[recipe_id]) - count
+        if missing <= max_missing:
+            matches.append((missing, -count, recipe_id))
+
+    for size in range(1, max_missing + 1):
+        for recipe_id in matrix.sizes.get(size, ()):
+            if recipe_id not in hits:
+                matches.append((size, 0, recipe_id))
+
+    matches.sort()
+    return [(recipe_id, missing) for missing, _, recipe_id in matches]
+
+
+def cached_find(user_id, covered, max_missing=0):
+    """find() for a user's pantry, reusing the list computed for an earlier page"""
+    key = f"cookable:{user_id}"
+    covered_key = sorted(covered)
+    generation = ingredient_matrix.generation()
+
+    entries = _cache().get(key) or {}
+    entry = entries.get(max_missing)
+    if entry is not None and entry["covered"] == covered_key and entry["generation"] == generation:
+        return entry["matches"]
+
+    matches = find(covered, max_missing)
+    entries = dict(entries)
+    entries[max_missing] = {"covered": covered_key, "generation": generation, "matches": matches}
+    _cache().set(key, entries)
+    return matches
+
+
+def invalidate(user_id):
+    """Drop a user's cached matches (call after committing a change to their pantry)"""
+    _cache().delete(f"cookable:{user_id}")
+
+
+def missing_ingredients(recipe_id, covered):
+    """Names of a recipe's ingredients outside the covered ids"""
+    matrix = ingredient_matrix.get_matrix()
+    return [matrix.names[i] for i in matrix.rows.get(recipe_id, ()) if i not in covered]
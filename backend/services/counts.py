@@ -0,0 +1,138 @@
+"""
+Result counts for the paginated endpoints
+
+- fetch_page computes the total in the same query as the page
+  (COUNT(*) OVER ()) instead of issuing a second COUNT with the same WHERE
+- totals are cached per normalized predicate with a TTL and are dropped
+  when the catalog changes
+- clients can pass include_total=false to skip counting entirely
+- the unfiltered recipe count is a maintained counter
+"""
+import threading
+import time
+
+from flask import current_app, request
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services import catalog
+from backend.services.pagination import split_page
+
+# Cache namespaces, invalidated independently
+RECIPES = 'recipes'
+
+_cache = {}
+_lock = threading.Lock()
+
+_recipe_total = None
+_recipe_total_at = None
+
+
+def normalize(value):
+    """Collapse case and whitespace so equivalent predicates share a cache entry"""
+    return ' '.join(str(value).lower().split())
+
+
+def include_total():
+    """False when the client passed include_total=false"""
+    return request.args.get('include_total', 'true', type=str).lower() not in ('false', '0', 'no')
+
+
+def get(namespace, key):
+    """Cached total for (namespace, key), or None"""
+    entry = _cache.get((namespace, key))
+    if entry is None:
+        return None
+    total, expires = entry
+    if time.monotonic() > expires:
+        _cache.pop((namespace, key), None)
+        return None
+    return total
+
+
+def put(namespace, key, total):
+    ttl = current_app.config.get('COUNT_CACHE_TTL', 300)
+    with _lock:
+        _cache[(namespace, key)] = (total, time.monotonic() + ttl)
+
+
+def invalidate(namespace):
+    """Drop every cached total in a namespace"""
+    with _lock:
+        for cache_key in [k for k in _cache if k[0] == namespace]:
+            del _cache[cache_key]
+
+
+def fetch_page(columns, table, where, order, params, per_page,
+               namespace, key, with_total=True, seek=''):
+    """
+    Run a paginated query and return (rows, has_more, total).
+
+    columns:    SELECT list
+    table:      FROM clause
+    where:      predicate shared by the page and its total ('' for none)
+    order:      ORDER BY clause
+    params:     bind params, including :offset
+    seek:       keyset predicate that only applies to the page
+    with_total: False returns total None without counting
+
+    On a cache miss the total rides along with the page as a window
+    count. Keyset pages cannot do that (the seek narrows the window), so
+    they fall back to one COUNT that is then cached for the next pages.
+    """
+    total = get(namespace, key) if with_total else None
+    in_query = with_total and total is None and not seek
+
+    predicates = [p for p in (where, seek) if p]
+    where_sql = f"WHERE {' AND '.join(predicates)}" if predicates else ''
+    window = ', COUNT(*) OVER () AS total_count' if in_query else ''
+
+    query = text(f"""
+        SELECT {columns}{window}
+        FROM {table}
+        {where_sql}
+        {order}
+        LIMIT :limit OFFSET :offset
+    """)
+    rows, has_more = split_page(db.session.execute(query, dict(params, limit=per_page + 1)), per_page)
+
+    if in_query and rows:
+        total = rows[0][-1]
+    elif in_query and params.get('offset', 0) == 0:
+        total = 0
+
+    if with_total and total is None:
+        count_sql = f"SELECT COUNT(*) FROM {table} WHERE {where}" if where else f"SELECT COUNT(*) FROM {table}"
+        total = db.session.execute(text(count_sql), params).scalar()
+
+    if with_total:
+        put(namespace, key, total)
+    return rows, has_more, total
+
+
+def recipe_total():
+    """Number of rows in `recipes`, kept current by catalog events"""
+    global _recipe_total, _recipe_total_at
+
+    if _recipe_total is None or time.monotonic() - _recipe_total_at > catalog.index_ttl():
+        total = db.session.execute(text("SELECT COUNT(*) FROM recipes")).scalar()
+        with _lock:
+            _recipe_total = total
+            _recipe_total_at = time.monotonic()
+    return _recipe_total
+
+
+def _on_recipe_change(recipe_id, event):
+    global _recipe_total
+
+    invalidate(RECIPES)
+    with _lock:
+        if _recipe_total is None:
+            return
+        if event == catalog.ADDED:
+            _recipe_total += 1
+        elif event == catalog.DELETED:
+            _recipe_total -= 1
+
+
+catalog.register(_on_recipe_change, recipe_total)
@@ -0,0 +1,87 @@
+"""
+Typo-tolerant fallbacks for the search endpoints
+
+When an exact search returns fewer than FUZZY_MIN_HITS results, the routes
+retry through the trigram indexes: each query word that is not a known
+recipe-name word is replaced by its closest known spellings ("spagetti" ->
+"spaghetti"), and ingredient searches fall back to the most similar
+ingredient names. Clients can opt out with fuzzy=false.
+"""
+from flask import request
+
+from backend.services import ingredient_vocabulary, name_autocomplete
+from backend.services.parsing import tokenize
+
+# Exact searches with fewer hits than this get fuzzy results
+FUZZY_MIN_HITS = 3
+
+# Known spellings tried for each unknown query word
+CANDIDATES_PER_WORD = 3
+
+# Most recipes a fuzzy name search returns
+MAX_RESULTS = 200
+
+
+def enabled():
+    """False when the client passed fuzzy=false"""
+    return request.args.get('fuzzy', 'true', type=str).lower() not in ('false', '0', 'no')
+
+
+def _word_candidates(index, word):
+    """[(known word, similarity)] standing in for one query word"""
+    if word in index.postings:
+        return [(word, 1.0)]
+    return index.trigrams.similar(word, CANDIDATES_PER_WORD)
+
+
+def correct(query):
+    """query with every unknown word replaced by its closest recipe-name word"""
+    index = name_autocomplete.get_index()
+    words = []
+    for word in tokenize(query):
+        candidates = _word_candidates(index, word)
+        words.append(candidates[0][0] if candidates else word)
+    return ' '.join(words)
+
+
+def recipe_names(query):
+    """
+    Return (recipe_ids, corrected query) for recipes whose name has a close
+    spelling of every query word. Recipes are ranked by the summed word
+    similarity, then by popularity.
+    """
+    index = name_autocomplete.get_index()
+    words = tokenize(query)
+    if not words:
+        return [], ''
+
+    scores = None
+    corrected = []
+    for word in words:
+        candidates = _word_candidates(index, word)
+        if not candidates:
+            return [], ''
+        corrected.append(candidates[0][0])
+
+        # Best similarity this word reaches in each recipe
+        word_scores = {}
+        for term, similarity in candidates:
+            for recipe_id in index.postings[term]:
+                if similarity > word_scores.get(recipe_id, 0):
+                    word_scores[recipe_id] = similarity
+
+        if scores is None:
+            scores = word_scores
+        else:
+            scores = {
+                recipe_id: score + word_scores[recipe_id]
+                for recipe_id, score in scores.items() if recipe_id in word_scores
+            }
+
+    ranked = sorted(scores, key=lambda recipe_id: (-scores[recipe_id], index.rank[recipe_id]))
+    return ranked[:MAX_RESULTS], ' '.join(corrected)
+
+
+def ingredients(query, limit=ingredient_vocabulary.RESULT_SIZE):
+    """Ingredient names spelled like query"""
+    return ingredient_vocabulary.similar(query, limit)
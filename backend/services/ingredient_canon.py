@@ -0,0 +1,205 @@
+"""
+Ingredient canonicalization shared by every pantry/recipe matcher
+
+A raw ingredient string is reduced to a canonical name in four steps:
+
+1. lowercase, drop parentheticals, digits and punctuation
+   ("Tomatoes (about 2 lbs)" -> "tomatoes")
+2. strip preparation and size modifiers ("fresh", "chopped", "large", ...)
+   and units ("cup", "tablespoon", ...)
+3. singularize every word ("tomatoes" -> "tomato", "berries" -> "berry")
+4. map aliases to one spelling ("scallion" -> "green onion",
+   "kosher salt" -> "salt")
+
+Two strings match when their canonical names are equal; words are never
+compared as substrings, so "salt" no longer matches "unsalted butter".
+Recipes store their canonical names at ingest (recipes.CanonicalIngredients)
+so matching at request time is a set lookup on ingredient ids
+(ingredient_matrix). Pantry items are canonicalized from their names when
+read (memoized), so they always follow the current rules.
+
+Stored names carry CANON_VERSION (recipes.CanonicalVersion). Rows written
+under another version are canonicalized again when read, and backfill()
+(run by the canonical_ingredients migration on every deploy) rewrites them.
+"""
+import json
+import re
+from functools import lru_cache
+
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services.parsing import parse_list
+
+# Bump whenever a change to the rules or the word tables below changes results
+CANON_VERSION = 2
+
+BATCH_SIZE = 1000
+
+PARENTHETICAL = re.compile(r"\([^)]*\)")
+NON_WORD = re.compile(r"[^a-z\s]")
+
+# Words that describe preparation, size or state rather than the ingredient
+MODIFIERS = {
+    "fresh", "freshly", "frozen", "dried", "dry", "raw", "cooked", "canned",
+    "chopped", "diced", "minced", "sliced", "shredded", "grated", "crushed",
+    "cubed", "julienned", "peeled", "seeded", "pitted", "halved", "quartered",
+    "trimmed", "rinsed", "drained", "softened", "melted", "beaten", "sifted",
+    "packed", "finely", "coarsely", "thinly", "roughly", "lightly", "very",
+    "large", "medium", "small", "extra", "jumbo", "whole", "boneless",
+    "skinless", "ripe", "organic", "unsalted", "salted", "room", "temperature",
+    "to", "taste", "of", "and", "or", "for", "optional",
+}
+
+# Measuring units left in free-typed names ("2 cups flour")
+UNITS = {
+    "cup", "tablespoon", "tbsp", "teaspoon", "tsp", "ounce", "oz", "pound",
+    "lb", "gram", "g", "kg", "ml", "liter", "pinch", "dash", "package", "pkg",
+}
+
+# Singular forms the suffix rules get wrong, and words that are not plurals
+IRREGULAR = {
+    "leaves": "leaf",
+    "halves": "half",
+    "loaves": "loaf",
+    "cookies": "cookie",
+    "pies": "pie",
+    "geese": "goose",
+}
+INVARIANT = {"molasses", "grits", "series", "species", "swiss"}
+
+# Alias -> canonical name (both sides already singular and modifier free)
+ALIASES = {
+    "scallion": "green onion",
+    "spring onion": "green onion",
+    "garbanzo bean": "chickpea",
+    "garbanzo": "chickpea",
+    "confectioner sugar": "powdered sugar",
+    "icing sugar": "powdered sugar",
+    "granulated sugar": "sugar",
+    "white sugar": "sugar",
+    "caster sugar": "sugar",
+    "castor sugar": "sugar",
+    "light brown sugar": "brown sugar",
+    "dark brown sugar": "brown sugar",
+    "all purpose flour": "flour",
+    "plain flour": "flour",
+    "white flour": "flour",
+    "kosher salt": "salt",
+    "sea salt": "salt",
+    "table salt": "salt",
+    "coarse salt": "salt",
+    "black pepper": "pepper",
+    "ground black pepper": "pepper",
+    "virgin olive oil": "olive oil",
+    "coriander leaf": "cilantro",
+    "cilantro leaf": "cilantro",
+    "courgette": "zucchini",
+    "aubergine": "eggplant",
+    "capsicum": "bell pepper",
+    "green bell pepper": "bell pepper",
+    "red bell pepper": "bell pepper",
+    "egg white": "egg",
+    "egg yolk": "egg",
+    "chicken breast half": "chicken breast",
+    "heavy whipping cream": "heavy cream",
+    "whipping cream": "heavy cream",
+    "half half": "half and half",
+    "double cream": "heavy cream",
+    "cornflour": "cornstarch",
+    "corn starch": "cornstarch",
+    "bicarbonate of soda": "baking soda",
+    "bicarbonate soda": "baking soda",
+    "garlic clove": "garlic",
+    "clove garlic": "garlic",
+    "warm water": "water",
+    "cold water": "water",
+    "boiling water": "water",
+    "ice water": "water",
+}
+
+
+def singular(word):
+    """A best-effort English singular of one lowercase word"""
+    if word in IRREGULAR:
+        return IRREGULAR[word]
+    if word in INVARIANT or len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("oes"):
+        return word[:-2]
+    if word.endswith(("ches", "shes", "sses", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=100000)
+def canonicalize(raw):
+    """Canonical name of one raw ingredient string ('' when nothing is left)"""
+    if not raw:
+        return ""
+    value = PARENTHETICAL.sub(" ", str(raw).lower())
+    value = NON_WORD.sub(" ", value)
+    words = [singular(word) for word in value.split() if word not in MODIFIERS]
+    name = " ".join(word for word in words if word not in UNITS)
+    return ALIASES.get(name, name)
+
+
+def recipe_canonicals(raw_ingredients):
+    """Sorted distinct canonical names of a recipe's ingredients column"""
+    return sorted({canonicalize(item) for item in parse_list(raw_ingredients)} - {""})
+
+
+def canonical_columns(raw_ingredients):
+    """The CanonicalIngredients / CanonicalVersion columns stored next to `ingredients`"""
+    return {
+        "CanonicalIngredients": json.dumps(recipe_canonicals(raw_ingredients)),
+        "CanonicalVersion": CANON_VERSION,
+    }
+
+
+def stored_canonicals(value, raw_ingredients=None, version=CANON_VERSION):
+    """
+    Canonical names from the stored column, computed from the raw column
+    when not stored yet or stored under another CANON_VERSION
+    """
+    if value is None or version != CANON_VERSION:
+        return recipe_canonicals(raw_ingredients)
+    if isinstance(value, (str, bytes)):
+        value = json.loads(value)
+    return list(value)
+
+
+def backfill(all_rows=False):
+    """
+    Canonicalize rows in primary-key batches: those never canonicalized or
+    written under another CANON_VERSION, or every row (all_rows).
+    """
+    stale = "" if all_rows else \
+        "AND (CanonicalIngredients IS NULL OR CanonicalVersion IS NULL OR CanonicalVersion <> :version)"
+
+    last_id = 0
+    while True:
+        rows = db.session.execute(text(f"""
+            SELECT RecipeId, ingredients
+            FROM recipes
+            WHERE RecipeId > :last_id {stale}
+            ORDER BY RecipeId
+            LIMIT :limit
+        """), {"last_id": last_id, "version": CANON_VERSION, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        db.session.execute(
+            text("""
+                UPDATE recipes
+                SET CanonicalIngredients = :CanonicalIngredients, CanonicalVersion = :CanonicalVersion
+                WHERE RecipeId = :rid
+            """),
+            [dict(canonical_columns(row[1]), rid=row[0]) for row in rows]
+        )
+        db.session.commit()
+        last_id = rows[-1][0]
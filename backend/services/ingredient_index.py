@@ -0,0 +1,86 @@
+"""
+Ingredient inverted index behind /api/recipes/search/ingredients
+
+Every word of every ingredient (from the `ingredients` and
+`RecipeIngredientParts` columns) maps to a sorted posting list of RecipeIds.
+A search is an intersection of posting lists; counts and pages are slices
+of the result, so the recipes table is only hit to fetch the page itself.
+"""
+import threading
+import time
+
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services import catalog
+from backend.services.inverted_index import InvertedIndex
+from backend.services.parsing import parse_list, tokenize
+
+_index = InvertedIndex()
+_built_at = None
+_lock = threading.Lock()
+
+
+def recipe_tokens(ingredients, ingredient_parts):
+    """All ingredient words of a recipe"""
+    tokens = set()
+    for item in parse_list(ingredients) + parse_list(ingredient_parts):
+        tokens.update(tokenize(item))
+    return tokens
+
+
+def build():
+    """(Re)build the index from the recipes table"""
+    global _index, _built_at
+
+    with _lock:
+        rows = db.session.execute(
+            text("SELECT RecipeId, ingredients, RecipeIngredientParts FROM recipes")
+        )
+        index = InvertedIndex()
+        index.build((row[0], recipe_tokens(row[1], row[2])) for row in rows)
+
+        _index = index
+        _built_at = time.monotonic()
+
+
+def get_index():
+    """Return the index, building it on first use or once it is older than the TTL"""
+    if _built_at is None or time.monotonic() - _built_at > catalog.index_ttl():
+        build()
+    return _index
+
+
+def search(query):
+    """
+    Sorted RecipeIds whose ingredients contain every word of query.
+    The last word is matched as a prefix so partially typed words still hit.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    return get_index().search(tokens, prefix_last=True)
+
+
+def _on_recipe_change(recipe_id, event):
+    if _built_at is None:
+        return
+
+    row = None
+    if event != catalog.DELETED:
+        row = db.session.execute(
+            text("""
+                SELECT ingredients, RecipeIngredientParts
+                FROM recipes
+                WHERE RecipeId = :rid
+            """),
+            {"rid": recipe_id}
+        ).fetchone()
+
+    with _lock:
+        _index.remove(recipe_id)
+        if row:
+            _index.add(recipe_id, recipe_tokens(row[0], row[1]))
+
+
+catalog.register(_on_recipe_change, build)
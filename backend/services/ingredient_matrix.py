@@ -0,0 +1,163 @@
+"""
+Recipe x ingredient sparse matrix
+
+- vocabulary: every distinct canonical ingredient name (ingredient_canon)
+              gets an integer id
+- rows:       recipe id -> tuple of ingredient ids (CSR view)
+- columns:    ingredient id -> sorted array of recipe ids (CSC view)
+- sizes:      number of distinct ingredients -> set of recipe ids
+
+Only recipes with ingredients and images are included, since those are the
+only ones the pantry features ever show.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services import catalog
+from backend.services.ingredient_canon import canonicalize, stored_canonicals
+
+ELIGIBLE_RECIPES = """
+    ingredients IS NOT NULL
+    AND ingredients != ''
+    AND ImageUrl IS NOT NULL
+"""
+
+
+def normalize(name):
+    """Lowercase and collapse whitespace"""
+    return ' '.join(str(name).lower().split())
+
+
+class IngredientMatrix:
+    def __init__(self):
+        self.vocabulary = {}
+        self.names = []
+        self.rows = {}
+        self.columns = []
+        self.sizes = {}
+
+    def ingredient_id(self, name):
+        """Id of a canonical ingredient name, adding it to the vocabulary if new"""
+        ingredient_id = self.vocabulary.get(name)
+        if ingredient_id is None:
+            ingredient_id = len(self.names)
+            self.vocabulary[name] = ingredient_id
+            self.names.append(name)
+            self.columns.append(array('i'))
+        return ingredient_id
+
+    def _row(self, canonical_names):
+        return tuple(sorted({self.ingredient_id(name) for name in canonical_names if name}))
+
+    def build(self, recipes):
+        """recipes: iterable of (recipe_id, canonical ingredient names)"""
+        columns = {}
+        for recipe_id, names in recipes:
+            row = self._row(names)
+            if not row:
+                continue
+            self.rows[recipe_id] = row
+            self.sizes.setdefault(len(row), set()).add(recipe_id)
+            for ingredient_id in row:
+                columns.setdefault(ingredient_id, []).append(recipe_id)
+
+        for ingredient_id, recipe_ids in columns.items():
+            self.columns[ingredient_id] = array('i', sorted(recipe_ids))
+
+    def set_row(self, recipe_id, canonical_names):
+        self.remove_row(recipe_id)
+        row = self._row(canonical_names)
+        if not row:
+            return
+        self.rows[recipe_id] = row
+        self.sizes.setdefault(len(row), set()).add(recipe_id)
+        for ingredient_id in row:
+            column = self.columns[ingredient_id]
+            column.insert(bisect_left(column, recipe_id), recipe_id)
+
+    def remove_row(self, recipe_id):
+        row = self.rows.pop(recipe_id, ())
+        if row:
+            self.sizes[len(row)].discard(recipe_id)
+        for ingredient_id in row:
+            column = self.columns[ingredient_id]
+            pos = bisect_left(column, recipe_id)
+            if pos < len(column) and column[pos] == recipe_id:
+                del column[pos]
+
+    def match(self, pantry_item):
+        """
+        Ingredient ids a pantry item stands for: the id of its canonical
+        name, or none when no recipe uses that ingredient.
+        """
+        ingredient_id = self.vocabulary.get(canonicalize(pantry_item))
+        return frozenset() if ingredient_id is None else frozenset((ingredient_id,))
+
+
+_matrix = IngredientMatrix()
+_built_at = None
+_generation = 0
+_lock = threading.Lock()
+
+
+def build():
+    """(Re)build the matrix from the recipes table"""
+    global _matrix, _built_at, _generation
+
+    with _lock:
+        rows = db.session.execute(text(f"""
+            SELECT RecipeId, CanonicalIngredients, ingredients, CanonicalVersion
+            FROM recipes
+            WHERE {ELIGIBLE_RECIPES}
+        """))
+        matrix = IngredientMatrix()
+        matrix.build((row[0], stored_canonicals(row[1], row[2], row[3])) for row in rows)
+
+        _matrix = matrix
+        _built_at = time.monotonic()
+        _generation += 1
+
+
+def get_matrix():
+    """Return the matrix, building it on first use or once it is older than the TTL"""
+    if _built_at is None or time.monotonic() - _built_at > catalog.index_ttl():
+        build()
+    return _matrix
+
+
+def generation():
+    """Changes whenever the matrix is rebuilt or a row changes (for caches of results)"""
+    return _generation
+
+
+def _on_recipe_change(recipe_id, event):
+    global _generation
+
+    if _built_at is None:
+        return
+
+    row = None
+    if event != catalog.DELETED:
+        row = db.session.execute(
+            text(f"""
+                SELECT CanonicalIngredients, ingredients, CanonicalVersion
+                FROM recipes
+                WHERE RecipeId = :rid AND {ELIGIBLE_RECIPES}
+            """),
+            {"rid": recipe_id}
+        ).fetchone()
+
+    with _lock:
+        if row:
+            _matrix.set_row(recipe_id, stored_canonicals(row[0], row[1], row[2]))
+        else:
+            _matrix.remove_row(recipe_id)
+        _generation += 1
+
+
+catalog.register(_on_recipe_change, build)
@@ -0,0 +1,164 @@
+"""
+Ingredient vocabulary behind the pantry ingredient search and autocomplete
+
+The `ingredient_vocabulary` table holds every distinct normalized ingredient
+of the `ingredients` column with the number of recipes using it. It is
+filled once by the migration and then kept exact by the recipe write paths,
+which call record_change inside their own transaction with the recipe's
+ingredients before and after the write.
+
+Reads are served from an in-memory copy (names sorted for prefix bisects,
+their counts and a trigram index for misspellings) that is reloaded after a catalog change or once it is
+older than the index TTL.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import bindparam, text
+
+from backend.databse import db
+from backend.services import catalog
+from backend.services.ingredient_matrix import normalize
+from backend.services.parsing import parse_list
+from backend.services.trigram import TrigramIndex
+
+# Suggestions returned by complete() unless asked otherwise
+RESULT_SIZE = 10
+
+_names = []
+_counts = {}
+_trigrams = TrigramIndex()
+_built_at = None
+_lock = threading.Lock()
+
+
+def recipe_ingredients(raw_ingredients):
+    """Distinct normalized ingredient names of one recipe (that fit the name column)"""
+    names = {normalize(item) for item in parse_list(raw_ingredients)}
+    return {name for name in names if name and len(name) <= 255}
+
+
+def _increment_sql():
+    if db.engine.dialect.name == 'mysql':
+        return """
+            INSERT INTO ingredient_vocabulary (name, recipe_count) VALUES (:name, 1)
+            ON DUPLICATE KEY UPDATE recipe_count = recipe_count + 1
+        """
+    return """
+        INSERT INTO ingredient_vocabulary (name, recipe_count) VALUES (:name, 1)
+        ON CONFLICT (name) DO UPDATE SET recipe_count = recipe_count + 1
+    """
+
+
+def record_change(old_ingredients, new_ingredients):
+    """
+    Adjust the vocabulary counts for one recipe write. Runs in the caller's
+    session; the caller commits. Pass None for the missing side of an
+    insert or delete.
+    """
+    old = recipe_ingredients(old_ingredients)
+    new = recipe_ingredients(new_ingredients)
+
+    added = sorted(new - old)
+    removed = sorted(old - new)
+
+    if added:
+        db.session.execute(text(_increment_sql()), [{"name": name} for name in added])
+
+    if removed:
+        db.session.execute(
+            text("""
+                UPDATE ingredient_vocabulary
+                SET recipe_count = recipe_count - 1
+                WHERE name IN :names
+            """).bindparams(bindparam("names", expanding=True)),
+            {"names": removed}
+        )
+        db.session.execute(text("DELETE FROM ingredient_vocabulary WHERE recipe_count <= 0"))
+
+
+def build():
+    """(Re)load the in-memory copy from the table"""
+    global _names, _counts, _trigrams, _built_at
+
+    with _lock:
+        rows = db.session.execute(text("SELECT name, recipe_count FROM ingredient_vocabulary"))
+        counts = {row[0]: row[1] for row in rows}
+
+        _names = sorted(counts)
+        _counts = counts
+        _trigrams = TrigramIndex(counts)
+        _built_at = time.monotonic()
+
+
+def _load():
+    if _built_at is None or time.monotonic() - _built_at > catalog.index_ttl():
+        build()
+    return _names, _counts
+
+
+def _by_popularity(names, counts):
+    return sorted(names, key=lambda name: (-counts[name], name))
+
+
+def _word_match(name, words):
+    """
+    True when every query word starts a word of name: "salt" finds
+    "sea salt" but not "unsalted butter"
+    """
+    name_words = name.split()
+    return all(any(part.startswith(word) for part in name_words) for word in words)
+
+
+def search(query):
+    """Every ingredient with a word starting with each word of query, most used first"""
+    names, counts = _load()
+    words = normalize(query).split()
+    return _by_popularity([name for name in names if _word_match(name, words)], counts)
+
+
+def complete(query, limit=RESULT_SIZE):
+    """
+    [(name, recipe count)] for the pantry "add item" box: ingredients starting
+    with query first, then ingredients with a word starting with each word
+    of query, most used first.
+    """
+    names, counts = _load()
+    query = normalize(query)
+    if not query:
+        return []
+
+    start = bisect_left(names, query)
+    end = bisect_left(names, query + "\uffff", start)
+    prefixed = _by_popularity(names[start:end], counts)[:limit]
+
+    if len(prefixed) < limit:
+        words = query.split()
+        others = [name for name in names if not name.startswith(query) and _word_match(name, words)]
+        prefixed += _by_popularity(others, counts)[:limit - len(prefixed)]
+
+    return [(name, counts[name]) for name in prefixed]
+
+
+def recipe_count(name):
+    """Recipes using an ingredient (0 if unknown)"""
+    _, counts = _load()
+    return counts.get(name, 0)
+
+
+def similar(query, limit=RESULT_SIZE):
+    """Ingredients spelled like query, most similar first (ties: most used)"""
+    _, counts = _load()
+    matches = _trigrams.similar(query, limit * 2)
+    matches.sort(key=lambda item: (-item[1], -counts[item[0]]))
+    return [name for name, _ in matches[:limit]]
+
+
+def _on_recipe_change(recipe_id, event):
+    global _built_at
+    # The table was already updated by the write; reload it on next use
+    _built_at = None
+
+
+catalog.register(_on_recipe_change, build)
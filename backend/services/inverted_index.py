@@ -0,0 +1,139 @@
+"""
+Generic token -> posting list index
+
+Posting lists are sorted arrays of document ids, so lookups, intersections
+and pagination never touch the database.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+def intersect(a, b):
+    """Intersect two sorted id sequences, probing the longer one with bisect"""
+    if len(a) > len(b):
+        a, b = b, a
+
+    result = []
+    lo = 0
+    hi = len(b)
+    for doc_id in a:
+        lo = bisect_left(b, doc_id, lo, hi)
+        if lo == hi:
+            break
+        if b[lo] == doc_id:
+            result.append(doc_id)
+            lo += 1
+    return result
+
+
+class InvertedIndex:
+    """Maps tokens to sorted arrays of document ids"""
+
+    def __init__(self):
+        self._postings = {}
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+    def build(self, documents):
+        """
+        Replace the index contents.
+
+        documents: iterable of (doc_id, tokens)
+        """
+        postings = {}
+        for doc_id, tokens in documents:
+            for token in set(tokens):
+                postings.setdefault(token, []).append(doc_id)
+
+        self._postings = {token: array("i", sorted(ids)) for token, ids in postings.items()}
+        self._vocabulary = sorted(self._postings)
+        self._vocabulary_dirty = False
+
+    def add(self, doc_id, tokens):
+        """Add a document under each of its tokens"""
+        for token in set(tokens):
+            ids = self._postings.get(token)
+            if ids is None:
+                self._postings[token] = array("i", [doc_id])
+                self._vocabulary_dirty = True
+                continue
+            pos = bisect_left(ids, doc_id)
+            if pos == len(ids) or ids[pos] != doc_id:
+                ids.insert(pos, doc_id)
+
+    def remove(self, doc_id, tokens=None):
+        """
+        Remove a document.
+
+        When the document's tokens are unknown every posting list is probed,
+        which is a bisect per token and still cheap at our vocabulary size.
+        """
+        candidates = set(tokens) if tokens is not None else list(self._postings)
+        for token in candidates:
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            pos = bisect_left(ids, doc_id)
+            if pos < len(ids) and ids[pos] == doc_id:
+                del ids[pos]
+                if not ids:
+                    del self._postings[token]
+                    self._vocabulary_dirty = True
+
+    def postings(self, token):
+        """Sorted ids for an exact token (empty if unknown)"""
+        return self._postings.get(token, ())
+
+    def tokens_with_prefix(self, prefix):
+        """All indexed tokens starting with prefix, in sorted order"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        end = bisect_right(vocabulary, prefix + "\uffff", start)
+        return vocabulary[start:end]
+
+    def prefix_postings(self, prefix):
+        """Sorted union of the posting lists of every token starting with prefix"""
+        tokens = self.tokens_with_prefix(prefix)
+        if len(tokens) == 1:
+            return self._postings[tokens[0]]
+
+        merged = set()
+        for token in tokens:
+            merged.update(self._postings[token])
+        return sorted(merged)
+
+    def search(self, tokens, prefix_last=False):
+        """
+        Return the sorted ids of documents containing every token.
+
+        With prefix_last the final token only has to be a prefix of an
+        indexed token, which keeps search-as-you-type working.
+        """
+        if not tokens:
+            return []
+
+        lists = [self.postings(token) for token in tokens[:-1]]
+        last = tokens[-1]
+        lists.append(self.prefix_postings(last) if prefix_last else self.postings(last))
+
+        lists.sort(key=len)
+        if not lists[0]:
+            return []
+
+        result = list(lists[0])
+        for ids in lists[1:]:
+            result = intersect(result, ids)
+            if not result:
+                break
+        return result
+
+    def vocabulary_size(self):
+        return len(self._postings)
+
+    def document_frequency(self, token):
+        return len(self._postings.get(token, ()))
+
@@ -0,0 +1,197 @@
+"""
+List membership stored one row per (list, recipe) in RecipeListItems
+
+Adding or removing recipes touches only their rows, and `position` keeps
+the order recipes were added in. "Which of my lists contain this recipe"
+is answered per user by list_membership from owner_lists.
+
+Dual read: lists written before the table existed (or by a worker still
+running the old code) keep their ids in the RecipeLists.recipe_ids JSON
+column. Reads append those legacy ids after the table rows, and the first
+write through this module moves them into the table and empties the column.
+"""
+import json
+
+from sqlalchemy import bindparam, text
+
+from backend.databse import db
+
+
+def _insert_ignore():
+    if db.engine.dialect.name == 'mysql':
+        return "INSERT IGNORE INTO"
+    return "INSERT OR IGNORE INTO"
+
+
+def legacy_ids(value):
+    """Recipe ids stored in the old JSON column (list, JSON string or None)"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = json.loads(value)
+    if isinstance(value, int):
+        value = [value]
+    return [int(rid) for rid in value]
+
+
+def recipe_ids_for(lists):
+    """
+    Recipe ids of many lists with one query.
+
+    lists: iterable of (list_id, legacy recipe_ids column)
+    Returns {list_id: [recipe ids in list order]}
+    """
+    lists = list(lists)
+    result = {list_id: [] for list_id, _ in lists}
+    if not lists:
+        return result
+
+    rows = db.session.execute(
+        text("""
+            SELECT list_id, recipe_id
+            FROM RecipeListItems
+            WHERE list_id IN :ids
+            ORDER BY list_id, position
+        """).bindparams(bindparam("ids", expanding=True)),
+        {"ids": list(result)}
+    )
+    for list_id, recipe_id in rows:
+        result[list_id].append(recipe_id)
+
+    # Dual read: ids still in the legacy column follow the table rows
+    for list_id, legacy in lists:
+        extra = legacy_ids(legacy)
+        if extra:
+            seen = set(result[list_id])
+            result[list_id] += [rid for rid in dict.fromkeys(extra) if rid not in seen]
+
+    return result
+
+
+def recipe_ids(recipe_list):
+    """Recipe ids of one Lists row, in list order"""
+    return recipe_ids_for([(recipe_list.list_id, recipe_list.recipe_ids)])[recipe_list.list_id]
+
+
+def owner_lists(owner_id):
+    """
+    Every list of an owner with its recipe ids, from one joined query:
+    [{"list_id", "title", "public", "recipe_ids"}] ordered by list_id
+    """
+    rows = db.session.execute(
+        text("""
+            SELECT l.list_id, l.title, l.is_public, l.recipe_ids, i.recipe_id
+            FROM RecipeLists l
+            LEFT JOIN RecipeListItems i ON i.list_id = l.list_id
+            WHERE l.owner_id = :owner_id
+            ORDER BY l.list_id, i.position
+        """),
+        {"owner_id": owner_id}
+    )
+
+    lists = {}
+    for list_id, title, is_public, legacy, recipe_id in rows:
+        entry = lists.get(list_id)
+        if entry is None:
+            entry = lists[list_id] = {
+                "list_id": list_id,
+                "title": title,
+                "public": bool(is_public),
+                "recipe_ids": [],
+                "legacy": legacy,
+            }
+        if recipe_id is not None:
+            entry["recipe_ids"].append(recipe_id)
+
+    # Dual read: ids still in the legacy column follow the table rows
+    for entry in lists.values():
+        extra = legacy_ids(entry.pop("legacy"))
+        if extra:
+            seen = set(entry["recipe_ids"])
+            entry["recipe_ids"] += [rid for rid in dict.fromkeys(extra) if rid not in seen]
+
+    return list(lists.values())
+
+
+def add(list_id, recipe_ids):
+    """Append recipe ids that are not in the list yet; returns how many were added"""
+    new_ids = list(dict.fromkeys(recipe_ids))
+    if not new_ids:
+        return 0
+
+    last = db.session.execute(
+        text("SELECT COALESCE(MAX(position), -1) FROM RecipeListItems WHERE list_id = :list_id"),
+        {"list_id": list_id}
+    ).scalar()
+
+    result = db.session.execute(
+        text(f"""
+            {_insert_ignore()} RecipeListItems (list_id, recipe_id, position)
+            VALUES (:list_id, :recipe_id, :position)
+        """),
+        [
+            {"list_id": list_id, "recipe_id": rid, "position": last + 1 + offset}
+            for offset, rid in enumerate(new_ids)
+        ]
+    )
+    return result.rowcount
+
+
+def remove(list_id, recipe_ids):
+    """Delete recipe ids from a list; returns how many were removed"""
+    if not recipe_ids:
+        return 0
+    result = db.session.execute(
+        text("""
+            DELETE FROM RecipeListItems
+            WHERE list_id = :list_id AND recipe_id IN :recipe_ids
+        """).bindparams(bindparam("recipe_ids", expanding=True)),
+        {"list_id": list_id, "recipe_ids": list(recipe_ids)}
+    )
+    return result.rowcount
+
+
+def clear(list_id):
+    """Delete every row of a list (called before deleting the list itself)"""
+    db.session.execute(
+        text("DELETE FROM RecipeListItems WHERE list_id = :list_id"),
+        {"list_id": list_id}
+    )
+
+
+def migrate(recipe_list):
+    """Move a Lists row's legacy JSON ids into the table (before writing to it)"""
+    extra = legacy_ids(recipe_list.recipe_ids)
+    if extra:
+        add(recipe_list.list_id, extra)
+        recipe_list.recipe_ids = []
+
+
+def fork(source_id, owner_id, title, is_public=False):
+    """
+    Copy a list (its legacy column and every item row, positions included)
+    to owner_id with INSERT ... SELECT statements, so the recipe ids never
+    pass through Python. Runs in the caller's session; returns the new list id.
+    """
+    result = db.session.execute(
+        text("""
+            INSERT INTO RecipeLists (owner_id, title, recipe_ids, is_public)
+            SELECT :owner_id, :title, recipe_ids, :is_public
+            FROM RecipeLists
+            WHERE list_id = :source_id
+        """),
+        {"owner_id": owner_id, "title": title, "is_public": is_public, "source_id": source_id}
+    )
+    new_id = result.lastrowid
+
+    db.session.execute(
+        text("""
+            INSERT INTO RecipeListItems (list_id, recipe_id, position)
+            SELECT :new_id, recipe_id, position
+            FROM RecipeListItems
+            WHERE list_id = :source_id
+        """),
+        {"new_id": new_id, "source_id": source_id}
+    )
+    return new_id
+
@@ -0,0 +1,73 @@
+"""
+Per-user "which of my lists contain this recipe" map for the heart state
+
+The first lookup for a user loads all of their lists' items with one query
+(list_items.owner_lists) and inverts it into recipe_id -> [list_id]. The
+map is cached per user and dropped by every list write of that user.
+
+The cache follows RECIPE_CACHE_BACKEND: 'filesystem' shares entries (and
+invalidations) between gunicorn workers, 'memory' keeps them per worker.
+"""
+import os
+
+from flask import current_app
+
+from backend.services import list_items
+from backend.services.recipe_cache import LRUCache
+
+FAVORITES_TITLE = "Favorites"
+
+_backend = None
+
+
+def _cache():
+    global _backend
+    if _backend is None:
+        config = current_app.config
+        ttl = config.get('LIST_MEMBERSHIP_TTL', 300)
+        if config.get('RECIPE_CACHE_BACKEND', 'memory') == 'filesystem':
+            from cachelib import FileSystemCache
+            _backend = FileSystemCache(
+                os.path.join(config.get('RECIPE_CACHE_DIR', './recipe_cache'), 'membership'),
+                threshold=config.get('RECIPE_CACHE_MAX_ENTRIES', 5000),
+                default_timeout=ttl
+            )
+        else:
+            _backend = LRUCache(
+                config.get('RECIPE_CACHE_MAX_ENTRIES', 5000),
+                config.get('RECIPE_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+                ttl
+            )
+    return _backend
+
+
+def _build(user_id):
+    membership = {"favorites": None, "recipes": {}}
+    for entry in list_items.owner_lists(user_id):
+        if entry["title"] == FAVORITES_TITLE and membership["favorites"] is None:
+            membership["favorites"] = entry["list_id"]
+        for recipe_id in entry["recipe_ids"]:
+            membership["recipes"].setdefault(recipe_id, []).append(entry["list_id"])
+    return membership
+
+
+def get(user_id):
+    """{"favorites": list id or None, "recipes": {recipe_id: [list_id, ...]}}"""
+    key = f"membership:{user_id}"
+    membership = _cache().get(key)
+    if membership is None:
+        membership = _build(user_id)
+        _cache().set(key, membership)
+    return membership
+
+
+def lookup(user_id, recipe_ids):
+    """Return (favorites list id, {recipe_id: [list_id, ...]}) for recipe_ids"""
+    membership = get(user_id)
+    recipes = membership["recipes"]
+    return membership["favorites"], {rid: recipes.get(rid, []) for rid in recipe_ids}
+
+
+def invalidate(user_id):
+    """Drop a user's cached map (call after committing any change to their lists)"""
+    _cache().delete(f"membership:{user_id}")
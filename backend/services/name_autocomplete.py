@@ -0,0 +1,214 @@
+"""
+Recipe name typeahead behind /api/recipes/autocomplete
+
+Every word of every normalized recipe name maps to an array of RecipeIds
+kept in popularity order, and the words themselves are kept in a sorted
+list so a partially typed word is a bisect range. A lookup lazily merges
+the (already ranked) arrays of the matching words and stops after
+RESULT_SIZE hits, so it never touches MySQL and never ranks the full match
+set.
+
+Popularity is AggregatedRating * log(1 + ReviewCount): a well rated recipe
+with many reviews beats a single five star review.
+
+The words also feed a trigram index used for typo-tolerant name search
+(backend/services/fuzzy_search.py).
+"""
+import heapq
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services import catalog
+from backend.services.parsing import tokenize
+from backend.services.trigram import TrigramIndex
+
+# Suggestions returned per lookup
+RESULT_SIZE = 8
+
+
+def popularity(rating, review_count):
+    return float(rating or 0) * math.log1p(review_count or 0)
+
+
+class NameIndex:
+    """Word -> RecipeIds ordered by popularity, plus the display names"""
+
+    def __init__(self):
+        self.names = {}
+        self.ratings = {}
+        self.rank = {}
+        self.postings = {}
+        self.vocabulary = []
+        self.trigrams = TrigramIndex()
+
+    def _key(self, recipe_id, rating, review_count):
+        # Best first, lower ids winning ties
+        return (-popularity(rating, review_count), recipe_id)
+
+    def build(self, rows):
+        """rows: iterable of (recipe_id, name, rating, review_count)"""
+        for recipe_id, name, rating, review_count in rows:
+            self.names[recipe_id] = name
+            self.ratings[recipe_id] = rating
+            self.rank[recipe_id] = self._key(recipe_id, rating, review_count)
+
+        for recipe_id in sorted(self.rank, key=self.rank.__getitem__):
+            for token in set(tokenize(self.names[recipe_id])):
+                self.postings.setdefault(token, array('i')).append(recipe_id)
+        self.vocabulary = sorted(self.postings)
+        self.trigrams = TrigramIndex(self.vocabulary)
+
+    def add(self, recipe_id, name, rating, review_count):
+        self.remove(recipe_id)
+        self.names[recipe_id] = name
+        self.ratings[recipe_id] = rating
+        self.rank[recipe_id] = self._key(recipe_id, rating, review_count)
+
+        for token in set(tokenize(name)):
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = array('i')
+                insort(self.vocabulary, token)
+                self.trigrams.add(token)
+            insort(ids, recipe_id, key=self.rank.__getitem__)
+
+    def remove(self, recipe_id):
+        name = self.names.pop(recipe_id, None)
+        if name is None:
+            return
+        self.ratings.pop(recipe_id, None)
+        key = self.rank[recipe_id]
+
+        for token in set(tokenize(name)):
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            pos = bisect_left(ids, key, key=self.rank.__getitem__)
+            if pos < len(ids) and ids[pos] == recipe_id:
+                del ids[pos]
+            if not ids:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+                self.trigrams.remove(token)
+        del self.rank[recipe_id]
+
+    def _prefix_tokens(self, prefix):
+        lo = bisect_left(self.vocabulary, prefix)
+        hi = bisect_left(self.vocabulary, prefix + "\uffff")
+        return self.vocabulary[lo:hi]
+
+    def complete(self, query, limit=RESULT_SIZE):
+        """
+        The most popular RecipeIds whose name contains every word of query.
+        The last word is a prefix unless query ends with a space.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        prefix = tokens[-1] if query[-1].isalnum() else None
+        required = tokens[:-1] if prefix else tokens
+        if any(token not in self.postings for token in required):
+            return []
+
+        prefix_streams = [self.postings[t] for t in self._prefix_tokens(prefix)] if prefix else []
+        if prefix and not prefix_streams:
+            return []
+
+        # Walk whichever side is smaller and check the other side per hit
+        rarest = min(required, key=lambda t: len(self.postings[t]), default=None)
+        if rarest is not None and (
+            not prefix or len(self.postings[rarest]) < sum(len(ids) for ids in prefix_streams)
+        ):
+            candidates = iter(self.postings[rarest])
+        else:
+            candidates = heapq.merge(*prefix_streams, key=self.rank.__getitem__)
+
+        results = []
+        seen = set()
+        for recipe_id in candidates:
+            if recipe_id in seen:
+                continue
+            seen.add(recipe_id)
+
+            words = set(tokenize(self.names[recipe_id]))
+            if not words.issuperset(required):
+                continue
+            if prefix and not any(word.startswith(prefix) for word in words):
+                continue
+
+            results.append(recipe_id)
+            if len(results) == limit:
+                break
+        return results
+
+
+_index = NameIndex()
+_built_at = None
+_lock = threading.Lock()
+
+
+def build():
+    """(Re)build the index from the recipes table"""
+    global _index, _built_at
+
+    with _lock:
+        rows = db.session.execute(
+            text("SELECT RecipeId, Name, AggregatedRating, ReviewCount FROM recipes")
+        )
+        index = NameIndex()
+        index.build(rows)
+
+        _index = index
+        _built_at = time.monotonic()
+
+
+def get_index():
+    """Return the index, building it on first use or once it is older than the TTL"""
+    if _built_at is None or time.monotonic() - _built_at > catalog.index_ttl():
+        build()
+    return _index
+
+
+def suggest(query, limit=RESULT_SIZE):
+    """Suggestion payloads (id, name, rating) for a partially typed name"""
+    index = get_index()
+    return [
+        {
+            'id': recipe_id,
+            'name': index.names[recipe_id],
+            'rating': float(index.ratings[recipe_id]) if index.ratings[recipe_id] else None,
+        }
+        for recipe_id in index.complete(query, limit)
+    ]
+
+
+def _on_recipe_change(recipe_id, event):
+    if _built_at is None:
+        return
+
+    row = None
+    if event != catalog.DELETED:
+        row = db.session.execute(
+            text("""
+                SELECT Name, AggregatedRating, ReviewCount
+                FROM recipes
+                WHERE RecipeId = :rid
+            """),
+            {"rid": recipe_id}
+        ).fetchone()
+
+    with _lock:
+        if row is None:
+            _index.remove(recipe_id)
+        else:
+            _index.add(recipe_id, row[0], row[1], row[2])
+
+
+catalog.register(_on_recipe_change, build)
@@ -0,0 +1,83 @@
+"""
+Keyset (cursor) pagination helpers
+
+A cursor is an opaque, URL-safe token holding the sort key values of the
+last row on the previous page. The next page is a seek past that row
+(`WHERE (key) > (last key) ORDER BY key LIMIT n`), so page 2000 costs the
+same as page 1, unlike LIMIT/OFFSET.
+"""
+import base64
+import json
+
+
+def encode_cursor(*values):
+    """Pack the sort key values of a row into an opaque cursor"""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size, numeric=False):
+    """
+    Unpack a cursor produced by encode_cursor.
+    Raises ValueError if it is malformed, does not hold `size` values, or
+    (numeric) holds a value that is not a number. Keys compared in Python
+    must be numeric: a string would make the comparison raise TypeError.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    if numeric and not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def seek_clause(columns, values, descending=None, prefix='k'):
+    """
+    Build the WHERE fragment that seeks past a row.
+
+    columns:    sort columns, the last one being the unique tiebreaker
+    values:     the values of the last row seen
+    descending: per-column flags (default all ascending)
+
+    Expanded into ORs rather than a row comparison so MySQL can use a
+    range scan on the matching composite index.
+    Returns (sql, params).
+    """
+    descending = descending or [False] * len(columns)
+    params = {f'{prefix}{i}': value for i, value in enumerate(values)}
+
+    terms = []
+    for i, column in enumerate(columns):
+        op = '<' if descending[i] else '>'
+        equals = [f'{columns[j]} = :{prefix}{j}' for j in range(i)]
+        terms.append('(' + ' AND '.join(equals + [f'{column} {op} :{prefix}{i}']) + ')')
+    return '(' + ' OR '.join(terms) + ')', params
+
+
+def split_page(rows, per_page):
+    """
+    Queries fetch per_page + 1 rows; the extra row only says whether a
+    next page exists. Returns (page_rows, has_more).
+    """
+    rows = list(rows)
+    return rows[:per_page], len(rows) > per_page
+
+
+def page_info(page, per_page, total, **extra):
+    """
+    The `pagination` block of a response. total may be None when the
+    client opted out of counting (include_total=false).
+    """
+    info = {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'total_pages': (total + per_page - 1) // per_page if total is not None else None
+    }
+    info.update(extra)
+    return info
@@ -0,0 +1,60 @@
+"""
+Pantry vs recipe ingredient matching shared by the missing-ingredients endpoints
+"""
+import json
+
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services.ingredient_canon import canonicalize
+
+
+def pantry_item_canonical(item):
+    """Canonical name of a stored pantry item, from its name under the current rules"""
+    return canonicalize(item.get("name", ""))
+
+
+def load_pantry_items(user_id):
+    """Canonical names of the items in a user's pantry (empty if none)"""
+    if not user_id:
+        return []
+
+    result = db.session.execute(
+        text("SELECT items FROM pantry WHERE user_id = :user_id"),
+        {"user_id": user_id}
+    ).fetchone()
+
+    if not result or not result[0]:
+        return []
+
+    items = result[0]
+    if isinstance(items, str):
+        items = json.loads(items)
+    names = (pantry_item_canonical(item) for item in items)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+class PantryMatcher:
+    """
+    Decides whether a recipe ingredient is covered by the pantry.
+
+    A pantry item covers an ingredient when both have the same canonical
+    name (see ingredient_canon), so "eggs" covers "2 large eggs" but "salt"
+    does not cover "unsalted butter". The pantry is a set of canonical
+    names and ingredient names are canonicalized once (memoized), so each
+    check is a set lookup.
+    """
+
+    def __init__(self, pantry_items):
+        self.pantry_items = {canonicalize(item) for item in pantry_items} - {""}
+
+    def covers(self, ingredient):
+        return canonicalize(ingredient) in self.pantry_items
+
+    def split(self, recipe_ingredients):
+        """Return (missing, present) keeping the recipe's order and spelling"""
+        missing = []
+        present = []
+        for ingredient in recipe_ingredients:
+            (present if self.covers(ingredient) else missing).append(ingredient)
+        return missing, present
@@ -0,0 +1,149 @@
+"""
+Parsing helpers for the recipe catalog columns
+
+The imported catalog stores lists in three different shapes:
+- R style vectors: c("blueberries", "granulated sugar")
+- JSON arrays written by approve_recipe: ["blueberries", "granulated sugar"]
+- plain comma separated strings (the `ingredients` column)
+"""
+import json
+import re
+
+R_VECTOR_ITEM = re.compile(r'"((?:[^"\\]|\\.)*)"')
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+ISO_DURATION = re.compile(
+    r"^P(?:(\d+(?:\.\d+)?)D)?(?:T(?:(\d+(?:\.\d+)?)H)?(?:(\d+(?:\.\d+)?)M)?(?:(\d+(?:\.\d+)?)S)?)?$"
+)
+
+# Typed nutrition column -> NutritionFacts keys it is read from
+# (keys are compared lowercased with everything but letters removed)
+NUTRITION_FIELDS = {
+    "Calories": ("calories", "calorie", "kcal", "energy"),
+    "ProteinContent": ("proteincontent", "protein"),
+    "FatContent": ("fatcontent", "fat", "totalfat"),
+    "CarbohydrateContent": ("carbohydratecontent", "carbohydrates", "carbohydrate", "carbs"),
+}
+
+
+def parse_list(value):
+    """Return the items of a catalog list column as a list of stripped strings"""
+    if value is None:
+        return []
+
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if item is not None and str(item).strip()]
+
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", errors="ignore")
+
+    value = str(value).strip()
+    if not value or value in ("NA", "character(0)"):
+        return []
+
+    # R style vector
+    if value.startswith("c("):
+        return [item.strip() for item in R_VECTOR_ITEM.findall(value) if item.strip()]
+
+    # JSON array (or a JSON encoded string)
+    if value[0] in '["':
+        try:
+            parsed = json.loads(value)
+            if isinstance(parsed, list):
+                return parse_list(parsed)
+            if isinstance(parsed, str):
+                return parse_list(parsed)
+        except ValueError:
+            pass
+
+    # Plain comma separated string
+    return [item.strip().strip('"') for item in value.split(",") if item.strip().strip('"')]
+
+
+def tokenize(value):
+    """Split free text into lowercase alphanumeric tokens"""
+    if not value:
+        return []
+    return TOKEN_PATTERN.findall(str(value).lower())
+
+
+def image_columns(images):
+    """
+    Parsed image columns stored next to the raw `Images` value:
+    ImageUrl (the primary image) and ImageList (JSON array of every image).
+    """
+    urls = parse_list(images)
+    return {
+        "ImageUrl": urls[0] if urls else None,
+        "ImageList": json.dumps(urls),
+    }
+
+
+def _number(value):
+    """A nutrition value (250, "250", "12.5 g") as a float, None if it has no number"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER_PATTERN.search(str(value))
+    return float(match.group()) if match else None
+
+
+def nutrition_columns(facts):
+    """
+    Typed columns stored next to the raw `NutritionFacts` value: Calories,
+    ProteinContent, FatContent and CarbohydrateContent as floats (None when
+    the field is missing). facts may be a dict or its JSON encoding.
+    """
+    if isinstance(facts, (str, bytes)):
+        try:
+            facts = json.loads(facts)
+        except ValueError:
+            facts = None
+    if not isinstance(facts, dict):
+        facts = {}
+
+    values = {re.sub(r"[^a-z]", "", str(key).lower()): value for key, value in facts.items()}
+    columns = {}
+    for column, keys in NUTRITION_FIELDS.items():
+        numbers = (_number(values.get(key)) for key in keys)
+        columns[column] = next((number for number in numbers if number is not None), None)
+    return columns
+
+
+def duration_minutes(value):
+    """
+    An ISO-8601 duration ("PT1H30M", "P1DT2H") as whole minutes, rounded.
+    A bare number is taken as minutes. None when the value is empty or
+    not a duration.
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return round(value)
+
+    value = str(value).strip().upper()
+    if not value or value == "NA":
+        return None
+    if NUMBER_PATTERN.fullmatch(value):
+        return round(float(value))
+
+    match = ISO_DURATION.match(value)
+    if not match or not any(match.groups()):
+        return None
+    days, hours, minutes, seconds = (float(part) if part else 0 for part in match.groups())
+    return round(days * 1440 + hours * 60 + minutes + seconds / 60)
+
+
+def duration_columns(cook_time, prep_time, total_time):
+    """
+    Integer-minute columns stored next to the ISO-8601 time strings:
+    CookMinutes, PrepMinutes and TotalMinutes. TotalMinutes falls back to
+    cook + prep when TotalTime is missing.
+    """
+    cook = duration_minutes(cook_time)
+    prep = duration_minutes(prep_time)
+    total = duration_minutes(total_time)
+    if total is None and (cook is not None or prep is not None):
+        total = (cook or 0) + (prep or 0)
+    return {"CookMinutes": cook, "PrepMinutes": prep, "TotalMinutes": total}
@@ -0,0 +1,132 @@
+"""
+Public list discovery: title search and the "top public lists" feed
+
+Every public list is kept in memory as a trimmed summary (title, owner,
+recipe count, copy count) together with
+
+- a title token index (InvertedIndex), so a search is an intersection of
+  posting lists with the last word prefix-matched, and
+- a popularity ranking, 2 * log(1 + copies) + log(1 + recipes): being
+  copied by other users counts most, bigger lists break ties.
+
+Search results and the feed are slices of the ranked order, so neither
+touches the database. The snapshot is rebuilt after a write to a public
+list in this worker (invalidate) and otherwise once it is older than
+PUBLIC_LISTS_TTL; other workers pick the write up at their TTL.
+"""
+import math
+import threading
+import time
+from bisect import bisect_right
+
+from flask import current_app
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services import list_items
+from backend.services.inverted_index import InvertedIndex
+from backend.services.parsing import tokenize
+
+
+def popularity(copy_count, recipe_count):
+    return 2 * math.log1p(copy_count or 0) + math.log1p(recipe_count or 0)
+
+
+class PublicLists:
+    def __init__(self):
+        self.summaries = {}
+        self.rank = {}
+        self.ranked = []
+        self.index = InvertedIndex()
+
+    def build(self, rows, item_counts):
+        """
+        rows:        (list_id, title, copy_count, owner, legacy recipe_ids)
+        item_counts: {list_id: rows in RecipeListItems}
+        """
+        for list_id, title, copy_count, owner, legacy in rows:
+            recipe_count = item_counts.get(list_id, 0) + len(list_items.legacy_ids(legacy))
+            self.summaries[list_id] = {
+                "list_id": list_id,
+                "title": title,
+                "owner": owner,
+                "recipe_count": recipe_count,
+                "copy_count": copy_count or 0,
+                "public": True,
+            }
+            self.rank[list_id] = (-popularity(copy_count, recipe_count), list_id)
+
+        self.ranked = sorted(self.rank.values())
+        self.index.build((list_id, tokenize(s["title"])) for list_id, s in self.summaries.items())
+
+    def page(self, list_ids, limit, offset=0, after=None):
+        """
+        Return (summaries, next_key, total) for list_ids in popularity order.
+
+        after:    rank key of the last list on the previous page (keyset);
+                  offset is ignored then
+        next_key: rank key to resume from, None on the last page
+        """
+        keys = sorted(self.rank[list_id] for list_id in list_ids)
+        start = bisect_right(keys, tuple(after)) if after is not None else offset
+        selected = keys[start:start + limit + 1]
+        next_key = list(selected[limit - 1]) if len(selected) > limit else None
+        return [self.summaries[key[1]] for key in selected[:limit]], next_key, len(keys)
+
+    def top(self, limit):
+        return [self.summaries[key[1]] for key in self.ranked[:limit]]
+
+    def search(self, query):
+        """Ids of lists whose title has every word of query (last word as a prefix)"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        return self.index.search(tokens, prefix_last=True)
+
+
+_lists = PublicLists()
+_built_at = None
+_lock = threading.Lock()
+
+
+def build():
+    """(Re)load every public list"""
+    global _lists, _built_at
+
+    with _lock:
+        rows = db.session.execute(text("""
+            SELECT l.list_id, l.title, l.copy_count, u.username, l.recipe_ids
+            FROM RecipeLists l
+            LEFT JOIN users u ON u.userId = l.owner_id
+            WHERE l.is_public = 1
+        """)).fetchall()
+        item_counts = dict(db.session.execute(text("""
+            SELECT i.list_id, COUNT(*)
+            FROM RecipeListItems i
+            JOIN RecipeLists l ON l.list_id = i.list_id
+            WHERE l.is_public = 1
+            GROUP BY i.list_id
+        """)).fetchall())
+
+        public_lists = PublicLists()
+        public_lists.build(rows, item_counts)
+
+        _lists = public_lists
+        _built_at = time.monotonic()
+
+
+def get_lists():
+    ttl = current_app.config.get("PUBLIC_LISTS_TTL", 300)
+    if _built_at is None or time.monotonic() - _built_at > ttl:
+        build()
+    return _lists
+
+
+def invalidate():
+    """
+    Rebuild on next use. Call after committing a change that a public
+    snapshot can see: a list that is or was public, or a copy_count bump.
+    """
+    global _built_at
+    _built_at = None
+
@@ -0,0 +1,104 @@
+"""
+Uniform random recipe sampling without ORDER BY RAND()
+
+Keeps dense, sorted arrays of eligible RecipeIds (all recipes, and recipes
+with images). Drawing k recipes is k random indexes into the array followed
+by a primary-key fetch, instead of sorting the whole table.
+"""
+import random
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services import catalog
+
+# Pools
+ALL = 'all'
+WITH_IMAGES = 'with_images'
+
+HAS_IMAGES = "ImageUrl IS NOT NULL"
+
+_pools = {ALL: array('i'), WITH_IMAGES: array('i')}
+_built_at = None
+_lock = threading.Lock()
+
+
+def build():
+    """(Re)load the id pools from the recipes table"""
+    global _pools, _built_at
+
+    with _lock:
+        rows = db.session.execute(text(f"""
+            SELECT RecipeId, CASE WHEN {HAS_IMAGES} THEN 1 ELSE 0 END
+            FROM recipes
+            ORDER BY RecipeId
+        """))
+        pools = {ALL: array('i'), WITH_IMAGES: array('i')}
+        for recipe_id, has_images in rows:
+            pools[ALL].append(recipe_id)
+            if has_images:
+                pools[WITH_IMAGES].append(recipe_id)
+
+        _pools = pools
+        _built_at = time.monotonic()
+
+
+def _get_pool(pool):
+    if _built_at is None or time.monotonic() - _built_at > catalog.index_ttl():
+        build()
+    return _pools[pool]
+
+
+def sample(pool, k, exclude=()):
+    """Up to k distinct random RecipeIds from a pool, skipping ids in exclude (a set)"""
+    ids = _get_pool(pool)
+    draw = min(k + len(exclude), len(ids))
+    picked = [ids[i] for i in random.sample(range(len(ids)), draw)]
+    return [recipe_id for recipe_id in picked if recipe_id not in exclude][:k]
+
+
+def _insert(ids, recipe_id):
+    pos = bisect_left(ids, recipe_id)
+    if pos == len(ids) or ids[pos] != recipe_id:
+        ids.insert(pos, recipe_id)
+
+
+def _remove(ids, recipe_id):
+    pos = bisect_left(ids, recipe_id)
+    if pos < len(ids) and ids[pos] == recipe_id:
+        del ids[pos]
+
+
+def _on_recipe_change(recipe_id, event):
+    if _built_at is None:
+        return
+
+    row = None
+    if event != catalog.DELETED:
+        row = db.session.execute(
+            text(f"""
+                SELECT CASE WHEN {HAS_IMAGES} THEN 1 ELSE 0 END
+                FROM recipes
+                WHERE RecipeId = :rid
+            """),
+            {"rid": recipe_id}
+        ).fetchone()
+
+    with _lock:
+        if row is None:
+            _remove(_pools[ALL], recipe_id)
+            _remove(_pools[WITH_IMAGES], recipe_id)
+            return
+
+        _insert(_pools[ALL], recipe_id)
+        if row[0]:
+            _insert(_pools[WITH_IMAGES], recipe_id)
+        else:
+            _remove(_pools[WITH_IMAGES], recipe_id)
+
+
+catalog.register(_on_recipe_change, build)
@@ -0,0 +1,149 @@
+"""
+Cache of fully built recipe payloads for GET /api/recipes/<id>
+
+Backends (config RECIPE_CACHE_BACKEND):
+- memory:     per-worker LRU bounded by entry count and approximate bytes,
+              entries expire after RECIPE_CACHE_TTL seconds
+- filesystem: cachelib FileSystemCache in RECIPE_CACHE_DIR, shared by every
+              gunicorn worker on the host (same approach as the session store),
+              so an invalidation in one worker is seen by all of them
+
+Entries are dropped through the catalog listener whenever a recipe is
+updated, deleted or approved.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from backend.services import catalog
+
+
+class LRUCache:
+    """Thread-safe LRU with a TTL, an entry limit and an approximate byte limit"""
+
+    def __init__(self, max_entries, max_bytes, ttl):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires = entry
+            if time.monotonic() > expires:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def delete(self, key):
+        with self._lock:
+            self._drop(key)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def size(self):
+        return {'entries': len(self._entries), 'bytes': self._bytes}
+
+
+class _RecipeCache:
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _get_backend(self):
+        if self.backend is None:
+            config = current_app.config
+            ttl = config.get('RECIPE_CACHE_TTL', 600)
+            if config.get('RECIPE_CACHE_BACKEND', 'memory') == 'filesystem':
+                from cachelib import FileSystemCache
+                self.backend = FileSystemCache(
+                    config.get('RECIPE_CACHE_DIR', './recipe_cache'),
+                    threshold=config.get('RECIPE_CACHE_MAX_ENTRIES', 5000),
+                    default_timeout=ttl
+                )
+            else:
+                self.backend = LRUCache(
+                    config.get('RECIPE_CACHE_MAX_ENTRIES', 5000),
+                    config.get('RECIPE_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+                    ttl
+                )
+        return self.backend
+
+    def get(self, recipe_id):
+        value = self._get_backend().get(str(recipe_id))
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, recipe_id, recipe):
+        self._get_backend().set(str(recipe_id), recipe)
+
+    def invalidate(self, recipe_id):
+        self._get_backend().delete(str(recipe_id))
+
+    def stats(self):
+        backend = self._get_backend()
+        stats = {
+            'backend': 'memory' if isinstance(backend, LRUCache) else 'filesystem',
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+        if isinstance(backend, LRUCache):
+            stats.update(backend.size())
+        return stats
+
+
+_cache = _RecipeCache()
+
+
+def get(recipe_id):
+    """Cached payload for recipe_id, or None"""
+    return _cache.get(recipe_id)
+
+
+def put(recipe_id, recipe):
+    _cache.set(recipe_id, recipe)
+
+
+def invalidate(recipe_id):
+    _cache.invalidate(recipe_id)
+
+
+def stats():
+    """Hit/miss counters and, for the memory backend, current size"""
+    return _cache.stats()
+
+
+def _on_recipe_change(recipe_id, event):
+    _cache.invalidate(recipe_id)
+
+
+catalog.register(_on_recipe_change)
@@ -0,0 +1,108 @@
+"""
+Range filters and sort orders for the recipe list endpoints
+
+Each filter param maps to a typed, indexed column on `recipes` and becomes
+one range predicate (max_calories=500 -> Calories <= :max_calories), so the
+database answers it with an index range scan instead of decoding the
+NutritionFacts JSON or the ISO-8601 time strings of every recipe. Recipes
+where the column is NULL (the value was never recorded) do not match a
+filter on it.
+
+Each sort maps to the columns of a (..., RecipeId) index, so pages are
+read in index order (forwards, or backwards for sort=top) and the next
+page is a keyset seek.
+"""
+import math
+
+from flask import request
+
+# Query param -> (column, comparison)
+RANGE_FILTERS = {
+    'min_rating': ('AggregatedRating', '>='),
+    'min_calories': ('Calories', '>='),
+    'max_calories': ('Calories', '<='),
+    'min_protein': ('ProteinContent', '>='),
+    'max_protein': ('ProteinContent', '<='),
+    'min_fat': ('FatContent', '>='),
+    'max_fat': ('FatContent', '<='),
+    'min_carbs': ('CarbohydrateContent', '>='),
+    'max_carbs': ('CarbohydrateContent', '<='),
+    'min_total_minutes': ('TotalMinutes', '>='),
+    'max_total_minutes': ('TotalMinutes', '<='),
+}
+
+# sort param -> ORDER BY (column, descending), the last column being the unique tiebreaker
+SORTS = {
+    'id': [('RecipeId', False)],
+    'time': [('TotalMinutes', False), ('RecipeId', False)],
+    'top': [('WeightedRating', True), ('RecipeId', True)],
+}
+DEFAULT_SORT = 'id'
+
+
+def from_request():
+    """
+    {param: value} for every range filter in the query string.
+    Raises ValueError naming the param when a value is not a number.
+    """
+    filters = {}
+    for param in RANGE_FILTERS:
+        value = request.args.get(param, '', type=str).strip()
+        if not value:
+            continue
+        try:
+            number = float(value)
+        except ValueError:
+            number = math.nan
+        if not math.isfinite(number):
+            raise ValueError(f'{param} must be a number')
+        filters[param] = number
+    return filters
+
+
+def where(filters):
+    """Return (predicates joined with AND, or '' for none; bind params)"""
+    predicates = [f"{RANGE_FILTERS[param][0]} {RANGE_FILTERS[param][1]} :{param}" for param in filters]
+    return ' AND '.join(predicates), dict(filters)
+
+
+def cache_key(filters):
+    """Hashable form of filters for the count cache"""
+    return tuple(sorted(filters.items()))
+
+
+def sort_from_request():
+    """The sort param (default 'id'); raises ValueError for an unknown one"""
+    sort = request.args.get('sort', DEFAULT_SORT, type=str).strip().lower() or DEFAULT_SORT
+    if sort not in SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(SORTS)}")
+    return sort
+
+
+def sort_columns(sort):
+    return [column for column, _ in SORTS[sort]]
+
+
+def sort_descending(sort):
+    """Per-column descending flags, as seek_clause takes them"""
+    return [descending for _, descending in SORTS[sort]]
+
+
+def order_by(sort):
+    return "ORDER BY " + ', '.join(
+        f"{column} DESC" if descending else column for column, descending in SORTS[sort]
+    )
+
+
+def sort_key(sort):
+    """Python key that orders sort-column values (numbers) the way order_by does"""
+    descending = sort_descending(sort)
+    return lambda values: tuple(-value if desc else value for value, desc in zip(values, descending))
+
+
+def sort_where(sort):
+    """
+    Predicate a sort needs ('' for none): rows without a value in a sort
+    column are left out, since NULLs cannot be sought past.
+    """
+    return ' AND '.join(f'{column} IS NOT NULL' for column in sort_columns(sort)[:-1])
@@ -0,0 +1,187 @@
+"""
+Shared recipe queries used by the index-backed endpoints
+"""
+import json
+
+from sqlalchemy import bindparam, text
+
+from backend.databse import db
+from backend.services import recipe_cache
+from backend.services.parsing import parse_list
+
+SUMMARY_COLUMNS = """RecipeId, Name, AuthorName, Description,
+                   RecipeCategory, AggregatedRating, ReviewCount, ImageUrl"""
+
+
+def summary_from_row(row):
+    """Build the recipe card payload returned by the list/search endpoints"""
+    return {
+        'id': row[0],
+        'name': row[1],
+        'author': row[2],
+        'description': row[3],
+        'category': row[4],
+        'rating': float(row[5]) if row[5] else None,
+        'reviewCount': row[6],
+        'image': row[7]
+    }
+
+
+def fetch_summaries(recipe_ids):
+    """
+    Fetch recipe cards by primary key, keeping the order of recipe_ids.
+    Ids that no longer exist are skipped.
+    """
+    if not recipe_ids:
+        return []
+
+    query = text(f"""
+        SELECT {SUMMARY_COLUMNS}
+        FROM recipes
+        WHERE RecipeId IN :ids
+    """).bindparams(bindparam('ids', expanding=True))
+
+    result = db.session.execute(query, {'ids': list(recipe_ids)})
+    by_id = {row[0]: summary_from_row(row) for row in result}
+    return [by_id[rid] for rid in recipe_ids if rid in by_id]
+
+
+DETAIL_COLUMNS = """RecipeId, Name, AuthorName, Description,
+                   RecipeCategory, Keywords, CookTime, PrepTime, TotalTime,
+                   DatePublished, AggregatedRating, ReviewCount,
+                   RecipeServings, RecipeYield,
+                   RecipeIngredientQuantities, RecipeIngredientParts,
+                   RecipeInstructions, NutritionFacts, Images, ingredients,
+                   ImageUrl, ImageList"""
+
+
+def detail_from_row(result):
+    """Build the full recipe payload returned by GET /api/recipes/<id>"""
+    # Unpack in order of SELECT columns
+    recipe = {
+        'id': result[0],
+        'name': result[1],
+        'author': result[2],
+        'description': result[3],
+        'category': result[4],
+        'keywords': result[5],
+        'cookTime': result[6],
+        'prepTime': result[7],
+        'totalTime': result[8],
+        'datePublished': result[9],
+        'rating': float(result[10]) if result[10] else None,
+        'reviewCount': result[11],
+        'servings': result[12],
+        'yield': result[13],
+        'quantities': result[14],
+        'ingredients': result[15],
+        'ingredientsParts': result[19],
+        'instructions': result[16],
+        'nutritionFacts': result[17],  # likely a JSON string
+        'images': result[18],
+        'imageUrl': result[20],
+        'imageList': parse_list(result[21])
+    }
+
+    # Optionally parse NutritionFacts if it's JSON
+    try:
+        if recipe['nutritionFacts']:
+            recipe['nutritionFacts'] = json.loads(recipe['nutritionFacts'])
+    except Exception:
+        pass  # leave as string if not JSON
+
+    return recipe
+
+
+def summary_from_detail(recipe):
+    """
+    Recipe card built from a cached full payload. Payloads cached before
+    imageUrl existed (filesystem backend) have no image.
+    """
+    return {
+        'id': recipe['id'],
+        'name': recipe['name'],
+        'author': recipe['author'],
+        'description': recipe['description'],
+        'category': recipe['category'],
+        'rating': recipe['rating'],
+        'reviewCount': recipe['reviewCount'],
+        'image': recipe.get('imageUrl')
+    }
+
+
+def fetch_details(recipe_ids):
+    """
+    Full payloads for recipe_ids, keyed by id.
+    Cached payloads are reused; the rest come from one IN query and are cached.
+    """
+    found = {}
+    missing = []
+    for rid in recipe_ids:
+        cached = recipe_cache.get(rid)
+        if cached is not None:
+            found[rid] = cached
+        else:
+            missing.append(rid)
+
+    if missing:
+        query = text(f"""
+            SELECT {DETAIL_COLUMNS}
+            FROM recipes
+            WHERE RecipeId IN :ids
+        """).bindparams(bindparam('ids', expanding=True))
+
+        for row in db.session.execute(query, {'ids': missing}):
+            recipe = detail_from_row(row)
+            recipe_cache.put(recipe['id'], recipe)
+            found[recipe['id']] = recipe
+
+    return found
+
+
+def fetch_cards(recipe_ids):
+    """
+    Recipe cards for recipe_ids in their order, reusing cached full payloads
+    and fetching the rest in one IN query. Ids that no longer exist are skipped.
+    """
+    found = {}
+    missing = []
+    for rid in recipe_ids:
+        cached = recipe_cache.get(rid)
+        if cached is not None:
+            found[rid] = summary_from_detail(cached)
+        else:
+            missing.append(rid)
+
+    for recipe in fetch_summaries(missing):
+        found[recipe['id']] = recipe
+
+    return [found[rid] for rid in recipe_ids if rid in found]
+
+
+def fetch_image_urls(recipe_ids):
+    """
+    Primary image URL of each recipe, keyed by id (recipes without an image
+    are left out). Cached payloads are reused; the rest come from one IN query.
+    """
+    found = {}
+    missing = []
+    for rid in dict.fromkeys(recipe_ids):
+        cached = recipe_cache.get(rid)
+        if cached is not None:
+            if cached.get('imageUrl'):
+                found[rid] = cached['imageUrl']
+        else:
+            missing.append(rid)
+
+    if missing:
+        query = text("""
+            SELECT RecipeId, ImageUrl
+            FROM recipes
+            WHERE RecipeId IN :ids AND ImageUrl IS NOT NULL
+        """).bindparams(bindparam('ids', expanding=True))
+
+        for row in db.session.execute(query, {'ids': missing}):
+            found[row[0]] = row[1]
+
+    return found
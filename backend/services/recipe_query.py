@@ -0,0 +1,232 @@
+"""
+Planner behind GET /api/recipes/query
+
+A query combines any of: a category, ingredients that must / must not
+appear, range filters on the typed columns (rating, time, nutrition) and a
+sort. Each condition has a source that can list its matching RecipeIds:
+
+- category:   the in-memory facet arrays (category_index)
+- ingredient: the in-memory posting lists (ingredient_index)
+- range:      the (column, RecipeId) index, sized with one cached COUNT
+
+The smallest in-memory list drives: the candidates start from it and are
+intersected with the other lists, smallest first. A range filter that is
+smaller still is read from its index and intersected too. Excluded
+ingredients are subtracted last. The rest is finished in SQL:
+
+- up to MAX_CANDIDATES candidates: the remaining range predicates and the
+  sort key are read for the candidates by primary key, in chunks, and the
+  page is a slice of the sorted keys;
+- otherwise (or when no category or ingredient was given): the sort index is
+  scanned with the range predicates, skipping rows that fail the in-memory
+  conditions, until the page is full.
+"""
+from bisect import bisect_right
+
+from sqlalchemy import bindparam, text
+
+from backend.databse import db
+from backend.services import category_index, counts, ingredient_index, recipe_filters
+from backend.services.inverted_index import intersect
+from backend.services.pagination import seek_clause
+from backend.services.parsing import tokenize
+
+# Largest candidate set finished by primary key lookups
+MAX_CANDIDATES = 20000
+
+# Ids per IN (...) list
+CHUNK_SIZE = 1000
+
+# Rows per round trip of a scan; doubles while rows keep being skipped
+SCAN_BATCH = 200
+MAX_SCAN_BATCH = 5000
+
+
+def ingredient_postings(term):
+    """Sorted RecipeIds whose ingredients contain every word of term"""
+    tokens = tokenize(term)
+    if not tokens:
+        return []
+    return ingredient_index.get_index().search(tokens)
+
+
+def category_postings(name):
+    """Sorted RecipeIds of the categories a name resolves to"""
+    facets = category_index.get_facets()
+    lists = [facets[category] for category in category_index.resolve(name) if category in facets]
+    if len(lists) == 1:
+        return lists[0]
+    return sorted(recipe_id for ids in lists for recipe_id in ids)
+
+
+def range_size(param, value):
+    """Recipes matching one range filter, counted on its index and cached"""
+    key = ('range', param, value)
+    size = counts.get(counts.RECIPES, key)
+    if size is None:
+        column, comparison = recipe_filters.RANGE_FILTERS[param]
+        size = db.session.execute(
+            text(f"SELECT COUNT(*) FROM recipes WHERE {column} {comparison} :value"),
+            {'value': value}
+        ).scalar()
+        counts.put(counts.RECIPES, key, size)
+    return size
+
+
+def range_ids(param, value):
+    column, comparison = recipe_filters.RANGE_FILTERS[param]
+    rows = db.session.execute(
+        text(f"SELECT RecipeId FROM recipes WHERE {column} {comparison} :value"),
+        {'value': value}
+    )
+    return sorted(row[0] for row in rows)
+
+
+def plan(category='', include=(), exclude=(), filters=None):
+    """
+    Return (candidates, residual, excluded).
+
+    candidates: sorted RecipeIds meeting the category, included ingredients
+                and any range filter picked to narrow them, or None when no
+                in-memory condition was given
+    residual:   range filters still to be applied in SQL
+    excluded:   RecipeIds having an excluded ingredient (already removed
+                from candidates)
+    """
+    residual = dict(filters or {})
+
+    sources = []
+    if category:
+        sources.append(category_postings(category))
+    sources += [ingredient_postings(term) for term in include]
+    sources.sort(key=len)
+
+    candidates = None
+    if sources:
+        candidates = list(sources[0])
+        for ids in sources[1:]:
+            if not candidates:
+                break
+            candidates = intersect(candidates, ids)
+
+    # A range filter matching fewer recipes than the candidates narrows them first
+    if candidates and residual:
+        sizes = {param: range_size(param, value) for param, value in residual.items()}
+        param = min(sizes, key=sizes.get)
+        if sizes[param] < len(candidates):
+            candidates = intersect(candidates, range_ids(param, residual.pop(param)))
+
+    excluded = set()
+    for term in exclude:
+        excluded.update(ingredient_postings(term))
+    if candidates is not None and excluded:
+        candidates = [recipe_id for recipe_id in candidates if recipe_id not in excluded]
+
+    return candidates, residual, excluded
+
+
+def _predicates(residual, sort):
+    filter_sql, params = recipe_filters.where(residual)
+    where = ' AND '.join(p for p in (filter_sql, recipe_filters.sort_where(sort)) if p)
+    return where, params
+
+
+def _candidate_keys(candidates, residual, sort):
+    """Sorted sort keys of the candidates that pass the residual filters"""
+    if not residual and sort == recipe_filters.DEFAULT_SORT:
+        return [(recipe_id,) for recipe_id in candidates]
+
+    where, params = _predicates(residual, sort)
+    query = text(f"""
+        SELECT {', '.join(recipe_filters.sort_columns(sort))}
+        FROM recipes
+        WHERE RecipeId IN :ids {'AND ' + where if where else ''}
+    """).bindparams(bindparam('ids', expanding=True))
+
+    keys = []
+    for start in range(0, len(candidates), CHUNK_SIZE):
+        rows = db.session.execute(query, dict(params, ids=candidates[start:start + CHUNK_SIZE]))
+        keys += [tuple(row) for row in rows]
+    keys.sort(key=recipe_filters.sort_key(sort))
+    return keys
+
+
+def _scan(keep, residual, sort, limit, after):
+    """
+    Walk the sort order in SQL, keeping rows whose id passes keep (None keeps
+    all). Returns (keys, has_more).
+    """
+    columns = recipe_filters.sort_columns(sort)
+    where, params = _predicates(residual, sort)
+
+    keys = []
+    batch = limit + 1 if keep is None else SCAN_BATCH
+    while True:
+        seek = ''
+        seek_params = {}
+        if after is not None:
+            seek, seek_params = seek_clause(columns, list(after), recipe_filters.sort_descending(sort))
+        predicates = ' AND '.join(p for p in (where, seek) if p)
+
+        rows = db.session.execute(text(f"""
+            SELECT {', '.join(columns)}
+            FROM recipes
+            {'WHERE ' + predicates if predicates else ''}
+            {recipe_filters.order_by(sort)}
+            LIMIT :batch
+        """), dict(params, **seek_params, batch=batch)).fetchall()
+
+        for row in rows:
+            if keep is None or keep(row[-1]):
+                keys.append(tuple(row))
+                if len(keys) > limit:
+                    return keys[:limit], True
+
+        if len(rows) < batch:
+            return keys, False
+        after = tuple(rows[-1])
+        batch = min(batch * 2, MAX_SCAN_BATCH)
+
+
+def run(category='', include=(), exclude=(), filters=None, sort=recipe_filters.DEFAULT_SORT,
+        limit=20, after=None, with_total=True):
+    """
+    Return (recipe_ids, next_key, total) for one page.
+
+    after:    sort key of the last recipe on the previous page (keyset)
+    next_key: sort key to resume from, None on the last page
+    total:    None when with_total is False, or when the page came from a
+              scan that skipped rows (counting would mean scanning it all)
+    """
+    candidates, residual, excluded = plan(category, include, exclude, filters)
+
+    if candidates is not None and len(candidates) <= MAX_CANDIDATES:
+        keys = _candidate_keys(candidates, residual, sort)
+        sort_key = recipe_filters.sort_key(sort)
+        start = bisect_right([sort_key(key) for key in keys], sort_key(after)) if after is not None else 0
+        selected = keys[start:start + limit + 1]
+        page, has_more = selected[:limit], len(selected) > limit
+        total = len(keys) if with_total else None
+    else:
+        keep = None
+        if candidates is not None:
+            keep = set(candidates).__contains__
+        elif excluded:
+            keep = lambda recipe_id: recipe_id not in excluded
+
+        page, has_more = _scan(keep, residual, sort, limit, after)
+
+        # Without skipped rows the total is one COUNT on the range predicates
+        total = None
+        if with_total and keep is None:
+            key = ('query', sort, recipe_filters.cache_key(residual))
+            total = counts.get(counts.RECIPES, key)
+            if total is None:
+                where, params = _predicates(residual, sort)
+                total = db.session.execute(
+                    text(f"SELECT COUNT(*) FROM recipes {'WHERE ' + where if where else ''}"), params
+                ).scalar()
+                counts.put(counts.RECIPES, key, total)
+
+    next_key = list(page[-1]) if has_more else None
+    return [key[-1] for key in page], next_key, total
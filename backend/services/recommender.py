@@ -0,0 +1,65 @@
+"""
+Pantry-match recommendations
+
+A recipe's score is the number of pantry items that match at least one of
+its ingredients. With the pantry expressed as ingredient-id sets (one per
+pantry item), that is a sparse product against the ingredient matrix
+columns: only recipes that share an ingredient with the pantry are touched.
+"""
+import heapq
+
+from sqlalchemy import bindparam, text
+
+from backend.databse import db
+from backend.services import ingredient_matrix, random_sampler
+
+
+def score(pantry_items):
+    """Return {recipe_id: match count} for every recipe matching any pantry item"""
+    matrix = ingredient_matrix.get_matrix()
+
+    scores = {}
+    for item in pantry_items:
+        # Each pantry item counts once per recipe, however many ingredients it hits
+        recipes = set()
+        for ingredient_id in matrix.match(item):
+            recipes.update(matrix.columns[ingredient_id])
+        for recipe_id in recipes:
+            scores[recipe_id] = scores.get(recipe_id, 0) + 1
+    return scores
+
+
+def top_matches(pantry_items, k):
+    """The k best (recipe_id, match count) pairs, best first, lower ids winning ties"""
+    scores = score(pantry_items)
+    return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+def fetch_cards(recipe_ids):
+    """Recommendation cards for recipe_ids, keyed by id"""
+    if not recipe_ids:
+        return {}
+
+    query = text("""
+        SELECT RecipeId, Name, ImageUrl, AggregatedRating, RecipeCategory
+        FROM recipes
+        WHERE RecipeId IN :ids
+    """).bindparams(bindparam('ids', expanding=True))
+
+    return {
+        r[0]: {
+            "id": r[0],
+            "name": r[1],
+            "images": r[2],
+            "rating": r[3],
+            "category": r[4],
+        }
+        for r in db.session.execute(query, {'ids': list(recipe_ids)})
+    }
+
+
+def random_cards(limit, exclude=()):
+    """limit random image-bearing recipe cards with matchCount 0"""
+    recipe_ids = random_sampler.sample(random_sampler.WITH_IMAGES, limit, exclude)
+    cards = fetch_cards(recipe_ids)
+    return [dict(cards[recipe_id], matchCount=0) for recipe_id in recipe_ids if recipe_id in cards]
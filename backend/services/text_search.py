@@ -0,0 +1,224 @@
+"""
+Ranked full-text recipe search behind /api/recipes/search
+
+Two interchangeable backends:
+- mysql:  FULLTEXT indexes (see backend/migrations/fulltext_search.py),
+          per-field MATCH scores combined with FIELD_WEIGHTS
+- memory: in-process BM25F index, used for local/SQLite runs
+
+Config SEARCH_BACKEND picks one explicitly; "auto" uses mysql whenever the
+database is MySQL.
+"""
+import heapq
+import math
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services import catalog, counts
+from backend.services.parsing import parse_list, tokenize
+
+# Name matches outrank ingredient matches, which outrank description matches
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'ingredients': 2.0,
+    'description': 1.0,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def backend_name():
+    """Which backend serves searches ("mysql" or "memory")"""
+    name = current_app.config.get('SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        return 'mysql' if db.engine.dialect.name == 'mysql' else 'memory'
+    return name
+
+
+def search(query, limit, offset=0, with_total=True):
+    """
+    Rank recipes against query.
+
+    Returns (recipe_ids, total) where recipe_ids is the requested page in
+    descending relevance order and total counts every matching recipe
+    (None when with_total is False and counting would cost a query).
+    """
+    if not tokenize(query):
+        return [], 0
+    if backend_name() == 'mysql':
+        return _mysql_search(query, limit, offset, with_total)
+    return _memory.search(query, limit, offset)
+
+
+# ==================== MYSQL FULLTEXT ====================
+
+def _mysql_search(query, limit, offset, with_total):
+    key = ('search', counts.normalize(query))
+    total = counts.get(counts.RECIPES, key) if with_total else None
+    in_query = with_total and total is None
+    window = ', COUNT(*) OVER () AS total_count' if in_query else ''
+
+    ids_query = text(f"""
+        SELECT RecipeId,
+               :w_name * MATCH(Name) AGAINST (:q IN NATURAL LANGUAGE MODE)
+             + :w_ingredients * MATCH(ingredients) AGAINST (:q IN NATURAL LANGUAGE MODE)
+             + :w_description * MATCH(Description) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score
+               {window}
+        FROM recipes
+        WHERE MATCH(Name, ingredients, Description) AGAINST (:q IN NATURAL LANGUAGE MODE)
+        ORDER BY score DESC, RecipeId
+        LIMIT :limit OFFSET :offset
+    """)
+    params = {
+        'q': query,
+        'w_name': FIELD_WEIGHTS['name'],
+        'w_ingredients': FIELD_WEIGHTS['ingredients'],
+        'w_description': FIELD_WEIGHTS['description'],
+        'limit': limit,
+        'offset': offset,
+    }
+    rows = db.session.execute(ids_query, params).fetchall()
+    recipe_ids = [row[0] for row in rows]
+
+    if in_query and rows:
+        total = rows[0][-1]
+    elif in_query:
+        # Empty page: only a page past the end leaves the total unknown
+        total = 0 if offset == 0 else db.session.execute(text("""
+            SELECT COUNT(*) FROM recipes
+            WHERE MATCH(Name, ingredients, Description) AGAINST (:q IN NATURAL LANGUAGE MODE)
+        """), {'q': query}).scalar()
+
+    if with_total:
+        counts.put(counts.RECIPES, key, total)
+    return recipe_ids, total
+
+
+# ==================== IN-PROCESS BM25F ====================
+
+class MemoryIndex:
+    """
+    BM25F over name / ingredients / description.
+
+    Per field: token -> {recipe_id: term frequency} plus each recipe's field
+    length. Field term frequencies are length-normalised, weighted and summed
+    before BM25 saturation, so one strong name match beats many weak
+    description matches.
+    """
+
+    def __init__(self):
+        self.postings = {field: {} for field in FIELD_WEIGHTS}
+        self.lengths = {field: {} for field in FIELD_WEIGHTS}
+        self.total_length = {field: 0 for field in FIELD_WEIGHTS}
+        self.doc_count = 0
+
+    def add(self, recipe_id, fields):
+        self.doc_count += 1
+        for field, tokens in fields.items():
+            postings = self.postings[field]
+            for token in tokens:
+                tfs = postings.setdefault(token, {})
+                tfs[recipe_id] = tfs.get(recipe_id, 0) + 1
+            self.lengths[field][recipe_id] = len(tokens)
+            self.total_length[field] += len(tokens)
+
+    def remove(self, recipe_id):
+        if recipe_id not in self.lengths['name']:
+            return
+        self.doc_count -= 1
+        for field in FIELD_WEIGHTS:
+            self.total_length[field] -= self.lengths[field].pop(recipe_id, 0)
+            postings = self.postings[field]
+            for token in [t for t, tfs in postings.items() if recipe_id in tfs]:
+                del postings[token][recipe_id]
+                if not postings[token]:
+                    del postings[token]
+
+    def _idf(self, token):
+        doc_freq = len(set().union(*(self.postings[f].get(token, {}) for f in FIELD_WEIGHTS)))
+        return math.log(1 + (self.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def score(self, tokens):
+        """Return {recipe_id: score} for every recipe matching any token"""
+        avg_length = {
+            field: (self.total_length[field] / self.doc_count) if self.doc_count else 0
+            for field in FIELD_WEIGHTS
+        }
+        scores = {}
+        for token in set(tokens):
+            idf = self._idf(token)
+            weighted_tf = {}
+            for field, weight in FIELD_WEIGHTS.items():
+                lengths = self.lengths[field]
+                avg = avg_length[field] or 1
+                for recipe_id, tf in self.postings[field].get(token, {}).items():
+                    norm = 1 - B + B * lengths[recipe_id] / avg
+                    weighted_tf[recipe_id] = weighted_tf.get(recipe_id, 0) + weight * tf / norm
+            for recipe_id, tf in weighted_tf.items():
+                scores[recipe_id] = scores.get(recipe_id, 0) + idf * tf / (K1 + tf)
+        return scores
+
+
+def _recipe_fields(name, ingredients, description):
+    ingredient_tokens = []
+    for item in parse_list(ingredients):
+        ingredient_tokens.extend(tokenize(item))
+    return {
+        'name': tokenize(name),
+        'ingredients': ingredient_tokens,
+        'description': tokenize(description),
+    }
+
+
+class _MemoryBackend:
+    def __init__(self):
+        self.index = None
+        self.built_at = None
+        self.lock = threading.Lock()
+
+    def build(self):
+        if backend_name() != 'memory':
+            return
+        with self.lock:
+            rows = db.session.execute(
+                text("SELECT RecipeId, Name, ingredients, Description FROM recipes")
+            )
+            index = MemoryIndex()
+            for row in rows:
+                index.add(row[0], _recipe_fields(row[1], row[2], row[3]))
+            self.index = index
+            self.built_at = time.monotonic()
+
+    def search(self, query, limit, offset):
+        if self.built_at is None or time.monotonic() - self.built_at > catalog.index_ttl():
+            self.build()
+
+        scores = self.index.score(tokenize(query))
+        top = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [recipe_id for recipe_id, _ in top[offset:]], len(scores)
+
+    def on_recipe_change(self, recipe_id, event):
+        if self.built_at is None:
+            return
+
+        row = None
+        if event != catalog.DELETED:
+            row = db.session.execute(
+                text("SELECT Name, ingredients, Description FROM recipes WHERE RecipeId = :rid"),
+                {"rid": recipe_id}
+            ).fetchone()
+
+        with self.lock:
+            self.index.remove(recipe_id)
+            if row:
+                self.index.add(recipe_id, _recipe_fields(row[0], row[1], row[2]))
+
+
+_memory = _MemoryBackend()
+catalog.register(_memory.on_recipe_change, _memory.build)
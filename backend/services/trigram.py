@@ -0,0 +1,70 @@
+"""
+Trigram similarity index for typo-tolerant matching
+
+Terms are split into padded character trigrams ("  b", " br", "bro", ...,
+"li ") the same way PostgreSQL's pg_trgm does, and similarity is the
+Jaccard ratio of the two trigram sets. A lookup only scores terms sharing
+at least one trigram with the query.
+"""
+import heapq
+from collections import Counter
+
+from backend.services.parsing import tokenize
+
+# pg_trgm's default similarity threshold
+SIMILARITY_THRESHOLD = 0.3
+
+
+def trigrams(value):
+    """Padded trigrams of every word of value"""
+    grams = set()
+    for word in tokenize(value):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    def __init__(self, terms=()):
+        self.sizes = {}
+        self.postings = {}
+        for term in terms:
+            self.add(term)
+
+    def add(self, term):
+        if term in self.sizes:
+            return
+        grams = trigrams(term)
+        if not grams:
+            return
+        self.sizes[term] = len(grams)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(term)
+
+    def remove(self, term):
+        if self.sizes.pop(term, None) is None:
+            return
+        for gram in trigrams(term):
+            terms = self.postings.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self.postings[gram]
+
+    def similar(self, query, limit=10, threshold=SIMILARITY_THRESHOLD):
+        """[(term, similarity)] best first, similarity >= threshold"""
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        scored = []
+        for term, common in shared.items():
+            similarity = common / (len(grams) + self.sizes[term] - common)
+            if similarity >= threshold:
+                scored.append((term, similarity))
+
+        return heapq.nlargest(limit, scored, key=lambda item: (item[1], -len(item[0])))
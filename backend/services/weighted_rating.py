@@ -0,0 +1,91 @@
+"""
+Bayesian weighted rating behind sort=top
+
+A raw average lets a single 5-star review outrank 4.8 stars from 2,000
+reviews. The weighted rating pulls every recipe towards the catalog mean C
+by RATING_PRIOR_REVIEWS (m) imaginary reviews:
+
+    WR = (v * R + m * C) / (v + m)      v = ReviewCount, R = AggregatedRating
+
+so a recipe needs many reviews to move far from C. Unrated recipes score C.
+
+WR is stored in `recipes.WeightedRating` with a (WeightedRating, RecipeId)
+index, so "top rated" pages are index-order scans. The write paths fill it
+for the row they change (rating_columns); C is read from the rating index
+and cached, and only a backfill re-scores rows written against an older C.
+"""
+import time
+
+from flask import current_app
+from sqlalchemy import text
+
+from backend.databse import db
+from backend.services import catalog
+
+BATCH_SIZE = 1000
+
+_mean = None
+_mean_at = None
+
+
+def prior_reviews():
+    return current_app.config.get('RATING_PRIOR_REVIEWS', 10)
+
+
+def catalog_mean():
+    """Mean AggregatedRating over rated recipes, cached for the index TTL"""
+    global _mean, _mean_at
+
+    if _mean is None or time.monotonic() - _mean_at > catalog.index_ttl():
+        mean = db.session.execute(
+            text("SELECT AVG(AggregatedRating) FROM recipes WHERE AggregatedRating IS NOT NULL")
+        ).scalar()
+        _mean = float(mean) if mean is not None else 0.0
+        _mean_at = time.monotonic()
+    return _mean
+
+
+def score(rating, reviews, mean=None, prior=None):
+    """Weighted rating of one recipe"""
+    mean = catalog_mean() if mean is None else mean
+    prior = prior_reviews() if prior is None else prior
+    reviews = max(int(reviews or 0), 0)
+    if rating is None:
+        return mean
+    if reviews + prior == 0:
+        return float(rating)
+    return (reviews * float(rating) + prior * mean) / (reviews + prior)
+
+
+def rating_columns(rating, reviews):
+    """The WeightedRating column stored next to AggregatedRating / ReviewCount"""
+    return {"WeightedRating": score(rating, reviews)}
+
+
+def backfill(all_rows=False):
+    """
+    Score rows in primary-key batches: those never scored, or every row
+    (all_rows) after RATING_PRIOR_REVIEWS changed or C drifted.
+    """
+    mean = catalog_mean()
+    prior = prior_reviews()
+    unscored = "" if all_rows else "AND WeightedRating IS NULL"
+
+    last_id = 0
+    while True:
+        rows = db.session.execute(text(f"""
+            SELECT RecipeId, AggregatedRating, ReviewCount
+            FROM recipes
+            WHERE RecipeId > :last_id {unscored}
+            ORDER BY RecipeId
+            LIMIT :limit
+        """), {"last_id": last_id, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        db.session.execute(
+            text("UPDATE recipes SET WeightedRating = :score WHERE RecipeId = :rid"),
+            [{"score": score(row[1], row[2], mean, prior), "rid": row[0]} for row in rows]
+        )
+        db.session.commit()
+        last_id = rows[-1][0]